@@ -0,0 +1,9 @@
+"""Flight search and summary engine behind the AeroScout Streamlit app.
+
+The engine has no Streamlit dependency, so it can be driven from workers,
+scripts and benchmarks as well as from ``main.py``.
+"""
+
+from aeroscout.currency import currency_symbol, get_currency_from_airport_code
+from aeroscout.engine import Engine, build_params
+from aeroscout.render import render_card
@@ -0,0 +1,158 @@
+import csv
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+CATALOG_PATH = Path(__file__).parent / "data" / "airports.csv"
+METRO_PATH = Path(__file__).parent / "data" / "metro_areas.csv"
+
+Airport = namedtuple("Airport", "iata name city country currency lat lon")
+
+
+def _search_keys(name, city):
+    """Lowercase full names plus each word suffix (``"heathrow airport"``)."""
+    keys = set()
+    for text in (name, city):
+        words = text.lower().split()
+        keys.update(" ".join(words[i:]) for i in range(len(words)))
+    return keys
+
+
+class AirportCatalog:
+    """Read-only IATA airport catalog with O(log n) lookup and prefix search.
+
+    Rows are held column-wise in IATA order: codes and names as plain
+    lists, country and currency as interned strings, coordinates in
+    ``array("f")``. A second sorted index maps lowercase city and airport
+    names, and every later word in them, to rows, so ``"LH"``, ``"lond"``
+    and ``"heath"`` all autocomplete by bisection.
+
+    ``metros`` maps IATA multi-airport city codes such as ``LON`` to the
+    airports they cover.
+    """
+
+    def __init__(self, rows, metros=None):
+        rows = sorted(rows, key=lambda row: row[0])
+        self.codes = [row[0] for row in rows]
+        self.names = [row[1] for row in rows]
+        self.cities = [row[2] for row in rows]
+        self.countries = [sys.intern(row[3]) for row in rows]
+        self.currencies = [sys.intern(row[4]) for row in rows]
+        self.lats = array("f", (float(row[5]) for row in rows))
+        self.lons = array("f", (float(row[6]) for row in rows))
+
+        index = sorted(
+            (key, i)
+            for i, row in enumerate(rows)
+            for key in _search_keys(row[1], row[2])
+        )
+        self._name_keys = [key for key, _ in index]
+        self._name_rows = array("i", (i for _, i in index))
+        self.metros = {code: tuple(members) for code, members in (metros or {}).items()}
+
+    @classmethod
+    def from_csv(cls, path=CATALOG_PATH, metro_path=METRO_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            rows = list(reader)
+        metros = {}
+        if metro_path is not None:
+            with open(metro_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader)
+                metros = {row[0]: row[3].split() for row in reader}
+        return cls(rows, metros)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _row(self, code):
+        code = code.strip().upper()
+        i = bisect_left(self.codes, code)
+        if i < len(self.codes) and self.codes[i] == code:
+            return i
+        return None
+
+    def _airport(self, i):
+        return Airport(
+            self.codes[i], self.names[i], self.cities[i], self.countries[i],
+            self.currencies[i], self.lats[i], self.lons[i],
+        )
+
+    def get(self, code):
+        i = self._row(code)
+        return None if i is None else self._airport(i)
+
+    def __contains__(self, code):
+        return self._row(code) is not None
+
+    def currency(self, code, default="USD"):
+        i = self._row(code)
+        return default if i is None else self.currencies[i]
+
+    def search(self, text, limit=10):
+        """Airports whose code, city or name starts with ``text``.
+
+        Exact and prefix code matches come first, then city/name matches.
+        """
+        text = text.strip()
+        if not text:
+            return []
+        rows = []
+        code = text.upper()
+        if len(code) <= 3:
+            i = bisect_left(self.codes, code)
+            while i < len(self.codes) and self.codes[i].startswith(code) and len(rows) < limit:
+                rows.append(i)
+                i += 1
+
+        key = text.lower()
+        i = bisect_left(self._name_keys, key)
+        while i < len(self._name_keys) and self._name_keys[i].startswith(key) and len(rows) < limit:
+            row = self._name_rows[i]
+            if row not in rows:
+                rows.append(row)
+            i += 1
+        return [self._airport(i) for i in rows]
+
+    def validate(self, code, label="Airport"):
+        """Error message for an unknown code, with suggestions, or None."""
+        if code.strip().upper() in self:
+            return None
+        suggestions = ", ".join(f"{airport.iata} ({airport.city or airport.name})" for airport in self.search(code, 3))
+        message = f"{label} code '{code.strip()}' is not a known IATA airport."
+        return f"{message} Did you mean {suggestions}?" if suggestions else message
+
+    def resolve(self, text, label="Airport"):
+        """``(codes, error)`` for a comma-separated list of airport or metro codes.
+
+        Airport codes win over metro codes, so ``DXB`` stays Dubai
+        International while ``LON`` expands to every London airport.
+        Duplicates are dropped, keeping first-seen order.
+        """
+        codes = []
+        for part in re.split(r"[,/;]", text):
+            code = part.strip().upper()
+            if not code:
+                continue
+            if code in self:
+                members = [code]
+            elif code in self.metros:
+                members = [member for member in self.metros[code] if member in self]
+            else:
+                return [], self.validate(code, label)
+            codes.extend(member for member in members if member not in codes)
+        if not codes:
+            return [], f"{label} needs at least one airport code."
+        return codes, None
+
+
+@lru_cache(maxsize=1)
+def default_catalog():
+    """The bundled catalog, loaded on first use and shared by the process."""
+    return AirportCatalog.from_csv()
@@ -0,0 +1,250 @@
+"""Batch flight searches over a CSV of routes, for scheduled sweeps.
+
+    python -m aeroscout.batch routes.csv --output results.jsonl --workers 8
+
+``routes.csv`` needs a header row with ``origin``, ``destination`` and
+``date`` (YYYY-MM-DD) columns; ``return_date`` and ``currency`` are
+optional. Origins and destinations take the same comma-separated and
+metro codes as the search form. Every search is appended to the output as
+one JSON line as soon as it completes, so memory stays flat however long
+the sweep. The output doubles as the checkpoint: rerunning the same
+command skips searches already written with status ``ok`` and rows already
+written as ``invalid``, and retries the rest. Every line has a ``key``; a
+retried search appends a new line with a higher ``attempt`` for the same
+key, so when reading the output the last line per key wins. Settings (API
+keys, quota, caches) come from environment variables named like the app
+secrets.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+
+from aeroscout.airports import default_catalog
+from aeroscout.cache import cache_key
+from aeroscout.currency import currency_symbol, get_currency_from_airport_code
+from aeroscout.engine import TOP_FLIGHTS, Engine, build_params
+from aeroscout.grid import min_price
+from aeroscout.quota import BACKGROUND
+from aeroscout.routes import route_pairs
+
+
+def invalid_key(row):
+    """Key for a CSV row that cannot be searched, stable across runs."""
+    return "invalid:" + cache_key({str(name): value for name, value in row.items()})
+
+
+def read_jobs(path, catalog=None):
+    """Yield ``(line, key, params, error)`` per search in a routes CSV.
+
+    Rows with several origins or destinations yield one search per pair;
+    a row that cannot be searched yields ``params=None`` and an error.
+    """
+    catalog = catalog or default_catalog()
+    with open(path, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), 2):
+            origins, error = catalog.resolve(row.get("origin") or "", "Origin")
+            destinations, destination_error = catalog.resolve(row.get("destination") or "", "Destination")
+            error = error or destination_error
+            try:
+                outbound = date.fromisoformat((row.get("date") or "").strip())
+                return_date = (row.get("return_date") or "").strip()
+                return_date = date.fromisoformat(return_date) if return_date else None
+            except ValueError as exc:
+                error = error or f"Bad date: {exc}"
+            if error:
+                yield line, invalid_key(row), None, error
+                continue
+            pairs = route_pairs(origins, destinations)
+            if not pairs:
+                yield line, invalid_key(row), None, "Origin and destination must be different airports."
+            for origin, destination in pairs:
+                currency = (row.get("currency") or "").strip().upper() or get_currency_from_airport_code(origin)
+                params = build_params(origin, destination, outbound, return_date, currency)
+                yield line, cache_key(params), params, None
+
+
+def normalize_flight(flight):
+    """Flat, table-shaped view of one itinerary."""
+    segments = flight.get("flights") or [{}]
+    return {
+        "price": flight.get("price"),
+        "duration_min": flight.get("total_duration"),
+        "stops": max(len(flight.get("flights") or []) - 1, 0),
+        "airlines": sorted({segment.get("airline") for segment in segments if segment.get("airline")}),
+        "departs": segments[0].get("departure_airport", {}).get("time"),
+        "arrives": segments[-1].get("arrival_airport", {}).get("time"),
+        "co2_grams": (flight.get("carbon_emissions") or {}).get("this_flight"),
+    }
+
+
+def result_record(line, key, params, results, top=TOP_FLIGHTS, summary=None, error=None, attempt=1):
+    """One output line for a search; ``results=None`` marks a failure."""
+    record = {
+        "key": key,
+        "line": line,
+        "status": "ok" if results is not None else ("invalid" if params is None else "failed"),
+        "attempt": attempt,
+    }
+    if params:
+        record.update(
+            origin=params["departure_id"],
+            destination=params["arrival_id"],
+            date=params["outbound_date"],
+            return_date=params.get("return_date"),
+            currency=params["currency"],
+        )
+    if results is not None:
+        itineraries = results.get("best_flights", []) + results.get("other_flights", [])
+        record.update(
+            min_price=min_price(results),
+            itineraries=len(itineraries),
+            price_level=(results.get("price_insights") or {}).get("price_level"),
+            best=[normalize_flight(flight) for flight in results.get("best_flights", [])[:top]],
+        )
+        if summary is not None:
+            record["summary"] = summary
+    elif error:
+        record["error"] = error
+    return record
+
+
+def read_checkpoint(path):
+    """``(finished, attempts)`` from an earlier run's output.
+
+    ``finished`` holds the keys written as ``ok`` or ``invalid``, which a
+    resumed run skips; ``attempts`` counts the lines written per key so a
+    retry is numbered after them. Unreadable lines are ignored.
+    """
+    finished = set()
+    attempts = {}
+    if not os.path.exists(path):
+        return finished, attempts
+    with open(path, encoding="utf-8") as f:
+        for text in f:
+            try:
+                record = json.loads(text)
+            except ValueError:
+                continue
+            key = record.get("key")
+            attempts[key] = attempts.get(key, 0) + 1
+            if record.get("status") in ("ok", "invalid"):
+                finished.add(key)
+    return finished, attempts
+
+
+def _open_output(path, restart):
+    if not restart and os.path.exists(path):
+        # A run killed mid-write leaves a partial last line; start on a fresh one
+        with open(path, "rb+") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+    return open(path, "w" if restart else "a", encoding="utf-8")
+
+
+def run(routes_path, output_path, engine, workers=8, top=TOP_FLIGHTS, summarize=False, restart=False,
+        progress=None, progress_every=5.0):
+    """Run every search in ``routes_path`` and return a throughput report."""
+    done, attempts = (set(), {}) if restart else read_checkpoint(output_path)
+    counts = {"ok": 0, "failed": 0, "invalid": 0, "skipped": 0}
+    latencies = []
+
+    def search(line, key, params):
+        start = time.perf_counter()
+        results = summary = None
+        error = "search failed or quota exhausted"
+        try:
+            with engine.tracer.span("batch.search", line=line):
+                results = engine.search_flights(params, priority=BACKGROUND, allow_stale=False)
+                if summarize and results and results.get("best_flights"):
+                    summary = engine.summarize(results["best_flights"], currency_symbol(params["currency"]))
+        except Exception as exc:
+            # One bad search must not stop the sweep; it is retried on resume
+            results, error = None, f"{type(exc).__name__}: {exc}"
+        return line, key, params, results, summary, error, time.perf_counter() - start
+
+    started = last_report = time.perf_counter()
+    with _open_output(output_path, restart) as out, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="batch"
+    ) as pool:
+        def write(record):
+            nonlocal last_report
+            counts[record["status"]] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            now = time.perf_counter()
+            if progress and now - last_report >= progress_every:
+                searched = counts["ok"] + counts["failed"]
+                progress(f"{searched} searched ({counts['failed']} failed), {searched / (now - started):.1f}/s")
+                last_report = now
+
+        def drain(futures):
+            for future in futures:
+                line, key, params, results, summary, error, elapsed = future.result()
+                latencies.append(elapsed)
+                write(result_record(line, key, params, results, top, summary, error, attempts.get(key, 0) + 1))
+
+        pending = set()
+        for line, key, params, error in read_jobs(routes_path):
+            if key in done:
+                counts["skipped"] += 1
+                continue
+            done.add(key)
+            if params is None:
+                write(result_record(line, key, None, None, error=error))
+                continue
+            pending.add(pool.submit(search, line, key, params))
+            # Keep the queue short so a huge CSV is never held as futures
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(finished)
+        drain(wait(pending).done)
+
+    wall = time.perf_counter() - started
+    searched = counts["ok"] + counts["failed"]
+    latencies.sort()
+    return dict(
+        counts,
+        searched=searched,
+        wall_s=round(wall, 3),
+        searches_per_s=round(searched / wall, 2) if wall else None,
+        latency_p50_ms=round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        latency_p95_ms=round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+        quota=engine.quota.stats(),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("routes", help="CSV with origin, destination, date[, return_date, currency] columns")
+    parser.add_argument("--output", default="results.jsonl", help="JSON lines output, also the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent searches")
+    parser.add_argument("--top", type=int, default=TOP_FLIGHTS, help="best itineraries kept per search")
+    parser.add_argument("--summarize", action="store_true", help="add a Gemini summary to each search")
+    parser.add_argument("--restart", action="store_true", help="overwrite the output instead of resuming")
+    parser.add_argument("--quota-per-minute", type=float, help="override QUOTA_PER_MINUTE for this run")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines on stderr")
+    args = parser.parse_args(argv)
+
+    settings = dict(os.environ)
+    if args.quota_per_minute:
+        settings["QUOTA_PER_MINUTE"] = args.quota_per_minute
+    engine = Engine(settings)
+    progress = None if args.quiet else lambda message: print(message, file=sys.stderr, flush=True)
+    report = run(
+        args.routes, args.output, engine,
+        workers=args.workers, top=args.top, summarize=args.summarize, restart=args.restart, progress=progress,
+    )
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
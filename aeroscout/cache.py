@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Params that never change the response and must not leak into keys
+IGNORED_PARAMS = {"api_key"}
+
+
+def cache_key(params):
+    """Stable key for a SerpAPI params dict, ignoring the API key."""
+    normalized = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS or value is None or value == "":
+            continue
+        value = str(value).strip()
+        if name in ("departure_id", "arrival_id"):
+            value = value.upper()
+        normalized[name] = value
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry TTL and LRU size bound.
+
+    Expired entries are not dropped on read, only by the size bound, so
+    ``get_stale`` can still serve them when a fresh value is unobtainable.
+    """
+
+    def __init__(self, ttl=900, max_entries=512, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires <= self.clock():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key):
+        """Value for ``key`` even if expired, or None if it was never cached or evicted."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.stale_hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SqliteTTLCache(TTLCache):
+    """Same contract as TTLCache, persisted to a SQLite file.
+
+    Values must be JSON serializable. Entries survive process restarts,
+    so a redeployed Streamlit app starts with a warm cache. Several caches
+    can share one file by using different ``table`` names.
+    """
+
+    def __init__(self, path, ttl=900, max_entries=512, clock=time.time, table="cache"):
+        super().__init__(ttl=ttl, max_entries=max_entries, clock=clock)
+        if not table.isidentifier():
+            raise ValueError(f"invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed)")
+
+    def get(self, key):
+        now = self.clock()
+        with self._lock, self._conn:
+            row = self._conn.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires = row
+            if expires <= now:
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(value)
+
+    def get_stale(self, key):
+        with self._lock:
+            row = self._conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.stale_hits += 1
+            return json.loads(row[0])
+
+    def set(self, key, value):
+        now = self.clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now),
+            )
+            overflow = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+def open_cache(path=None, ttl=900, max_entries=512, table="cache"):
+    """Build an on-disk cache when ``path`` is given, else an in-memory one."""
+    if path:
+        return SqliteTTLCache(path, ttl=ttl, max_entries=max_entries, table=table)
+    return TTLCache(ttl=ttl, max_entries=max_entries)
@@ -0,0 +1,96 @@
+import re
+from collections import deque, namedtuple
+
+# ``source`` is "gemini", "cache" or "local" (answered from the flight data)
+Turn = namedtuple("Turn", "query reply prompt_tokens source")
+
+DIGEST_INTRO = "Earlier in this conversation (condensed):"
+
+
+def estimate_tokens(text):
+    """Rough token count, about four characters per token, without a network call."""
+    return len(text) // 4 + 1
+
+
+def compact_turn(query, reply, limit=160):
+    """One digest line: the question and the first sentence of the answer."""
+    first = re.split(r"(?<=[.!?])\s+", " ".join(reply.split()), maxsplit=1)[0]
+    if len(first) > limit:
+        first = first[:limit - 1].rstrip() + "…"
+    return f"- Q: {' '.join(query.split())} A: {first}"
+
+
+class ChatContext:
+    """Token-budgeted history for the chat about one set of flights.
+
+    The primer (summary prompt plus Gemini's summary) is always sent
+    verbatim and is not counted against ``budget``, which covers the
+    conversation after it. A quarter of the budget goes to a digest of
+    older turns, one line each, keeping only its newest lines. The rest
+    holds up to ``recent_turns`` turns verbatim; older turns are folded,
+    oldest first, into the digest, except the latest turn, which is always
+    kept whole. Prompt size is therefore bounded by the primer, the budget
+    and one turn, however long the conversation runs. ``turns`` keeps the
+    full log for display, with the prompt tokens each turn sent.
+    ``flights`` and ``symbol`` are the shortlist the conversation is about.
+    """
+
+    def __init__(self, fingerprint, primer, summary_text, budget=3000, recent_turns=4,
+                 count_tokens=estimate_tokens, flights=(), symbol=""):
+        self.fingerprint = fingerprint
+        self.flights = list(flights)
+        self.symbol = symbol
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.count_tokens = count_tokens
+        self.turns = []
+        self._primer = [
+            {"role": "user", "parts": [primer]},
+            {"role": "model", "parts": [summary_text]},
+        ]
+        self._primer_tokens = count_tokens(primer) + count_tokens(summary_text)
+        self._recent = deque()
+        self._digest = deque()
+
+    def contents(self):
+        """History to prime a chat session with: primer, digest, recent turns."""
+        contents = list(self._primer)
+        if self._digest:
+            contents.append({"role": "user", "parts": ["\n".join([DIGEST_INTRO, *self._digest])]})
+            contents.append({"role": "model", "parts": ["Understood."]})
+        for query, reply in self._recent:
+            contents.append({"role": "user", "parts": [query]})
+            contents.append({"role": "model", "parts": [reply]})
+        return contents
+
+    def _digest_tokens(self):
+        return sum(self.count_tokens(line) for line in self._digest)
+
+    def _recent_tokens(self):
+        return sum(self.count_tokens(query) + self.count_tokens(reply) for query, reply in self._recent)
+
+    def prompt_tokens(self, query):
+        """Estimated tokens sent when ``query`` is asked next."""
+        return self._primer_tokens + self._digest_tokens() + self._recent_tokens() + self.count_tokens(query)
+
+    def add_turn(self, query, reply, prompt_tokens=0, source="gemini"):
+        self.turns.append(Turn(query, reply, prompt_tokens, source))
+        self._recent.append((query, reply))
+        digest_budget = self.budget // 4
+        while len(self._recent) > 1 and (
+            len(self._recent) > self.recent_turns or self._recent_tokens() > self.budget - digest_budget
+        ):
+            self._digest.append(compact_turn(*self._recent.popleft()))
+        while self._digest and self._digest_tokens() > digest_budget:
+            self._digest.popleft()
+
+    def stats(self):
+        sent = [turn.prompt_tokens for turn in self.turns if turn.source == "gemini"]
+        return {
+            "turns": len(self.turns),
+            "verbatim_turns": len(self._recent),
+            "digest_lines": len(self._digest),
+            "next_prompt_tokens": self.prompt_tokens(""),
+            "last_prompt_tokens": sent[-1] if sent else 0,
+            "max_prompt_tokens": max(sent) if sent else 0,
+        }
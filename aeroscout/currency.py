@@ -0,0 +1,19 @@
+from aeroscout.airports import default_catalog
+
+# Display symbol for each currency code
+CURRENCY_SYMBOLS = {
+    "USD": "$", "INR": "₹", "EUR": "€", "GBP": "£", "AUD": "A$", "JPY": "¥", "CAD": "C$",
+    "CNY": "¥", "CHF": "CHF", "DKK": "kr", "NOK": "kr", "SEK": "kr", "TRY": "₺", "CZK": "Kč",
+    "PLN": "zł", "HUF": "Ft", "AED": "د.إ", "QAR": "ر.ق", "ZAR": "R", "BRL": "R$", "ARS": "$",
+    "CLP": "$", "PEN": "S/", "COP": "$", "MXN": "$", "NZD": "NZ$", "VND": "₫", "THB": "฿",
+    "MYR": "RM", "SGD": "S$", "IDR": "Rp", "PHP": "₱", "HKD": "HK$", "TWD": "NT$", "SAR": "﷼",
+    "KES": "KSh", "EGP": "E£", "ETB": "Br"
+}
+
+
+def get_currency_from_airport_code(code):
+    return default_catalog().currency(code, default="USD")
+
+
+def currency_symbol(currency):
+    return CURRENCY_SYMBOLS.get(currency, currency)
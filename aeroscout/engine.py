@@ -0,0 +1,369 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from aeroscout.cache import cache_key, open_cache
+from aeroscout.context import ChatContext
+from aeroscout.grid import date_pairs, fan_out, min_price
+from aeroscout.intents import LocalAnswerer
+from aeroscout.llm import (
+    GenerationStats,
+    build_summary_prompt,
+    chat_cache_key,
+    flight_fingerprint,
+    stream_text,
+    summary_cache_key,
+)
+from aeroscout.quota import BACKGROUND, INTERACTIVE, QuotaGovernor, SqliteTokenBucket, TokenBucket
+from aeroscout.routes import route_label, route_pairs
+from aeroscout.serpapi import SERPAPI_URL, SerpApiClient, SerpApiError
+from aeroscout.singleflight import SingleFlight
+from aeroscout.tracing import Tracer
+
+# Every tunable, keyed by the secret/environment name it is read from
+DEFAULT_SETTINGS = {
+    "SERPAPI_API_KEY": None,
+    "GEMINI_API_KEY": None,
+    "GEMINI_MODEL": "gemini-2.5-flash",
+    "SERPAPI_URL": SERPAPI_URL,
+    "SERPAPI_POOL_SIZE": 10,
+    "SERPAPI_TIMEOUT": 20.0,
+    "SERPAPI_MAX_RETRIES": 3,
+    "QUOTA_PER_MINUTE": 30.0,
+    "QUOTA_BURST": 10,
+    "QUOTA_DB_PATH": None,
+    "QUOTA_INTERACTIVE_WAIT": 5.0,
+    "QUOTA_BACKGROUND_WAIT": 30.0,
+    "RESPONSE_CACHE_PATH": None,
+    "RESPONSE_CACHE_TTL": 900,
+    "RESPONSE_CACHE_MAX_ENTRIES": 512,
+    "LLM_CACHE_PATH": None,
+    "LLM_CACHE_TTL": 86400,
+    "LLM_CACHE_MAX_ENTRIES": 2048,
+    "CHAT_CONTEXT_TOKENS": 3000,
+    "CHAT_RECENT_TURNS": 4,
+    "GRID_MAX_WORKERS": 4,
+    "ROUTE_MAX_WORKERS": 4,
+    "MAX_ROUTE_PAIRS": 9,
+    "RETURN_PREFETCH_WORKERS": 3,
+    "RETURN_PREFETCH_TOP_K": 3,
+    "WATCH_DB_PATH": "price_history.db",
+    "WATCH_INTERVAL": 21600,
+    "WATCH_JITTER": 0.1,
+    "WATCH_POLLS_PER_HOUR": 30,
+    "WATCH_RETRY_DELAY": 300,
+    "TRACE_ENABLED": False,
+    "TRACE_BUFFER_SIZE": 2048,
+    "TRACE_EXPORT_PATH": None,
+}
+
+# Number of itineraries shown as cards and fed to the summary prompt
+TOP_FLIGHTS = 5
+
+
+def load_settings(source):
+    """Merge a secrets/env mapping over DEFAULT_SETTINGS, coercing numbers."""
+    settings = dict(DEFAULT_SETTINGS)
+    for name, default in DEFAULT_SETTINGS.items():
+        value = source.get(name)
+        if value is None or value == "":
+            continue
+        if isinstance(default, bool):
+            value = value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "yes", "on")
+        elif isinstance(default, (int, float)):
+            value = type(default)(value)
+        settings[name] = value
+    return settings
+
+
+def build_params(from_city, to_city, date, return_date, currency):
+    """SerpAPI google_flights params for one route and date pair."""
+    params = {
+        "engine": "google_flights",
+        "departure_id": from_city,
+        "arrival_id": to_city,
+        "outbound_date": date.strftime("%Y-%m-%d"),
+        "currency": currency,
+        "hl": "en"
+    }
+    if return_date:
+        params["return_date"] = return_date.strftime("%Y-%m-%d")
+    return params
+
+
+class Engine:
+    """Search → summary → chat pipeline, independent of Streamlit.
+
+    Nothing talks to the network until first use: the SerpAPI client and
+    the Gemini model are built lazily, and ``google.generativeai`` is only
+    imported then. One instance is meant to be shared by the whole process
+    (the Streamlit page keeps it in ``st.cache_resource``); ``client`` and
+    ``model`` can be injected to drive it against stand-ins.
+    """
+
+    def __init__(self, settings=None, client=None, model=None):
+        self.settings = load_settings(settings or {})
+        self._client = client
+        self._model = model
+        self._prefetch_pool = None
+        self._lock = threading.Lock()
+
+        s = self.settings
+        self.tracer = Tracer(s["TRACE_ENABLED"], capacity=s["TRACE_BUFFER_SIZE"], export_path=s["TRACE_EXPORT_PATH"])
+        self.response_cache = open_cache(
+            s["RESPONSE_CACHE_PATH"], ttl=s["RESPONSE_CACHE_TTL"], max_entries=s["RESPONSE_CACHE_MAX_ENTRIES"]
+        )
+        self.llm_caches = {
+            "summary": open_cache(
+                s["LLM_CACHE_PATH"], ttl=s["LLM_CACHE_TTL"], max_entries=s["LLM_CACHE_MAX_ENTRIES"], table="summaries"
+            ),
+            "chat": open_cache(
+                s["LLM_CACHE_PATH"], ttl=s["LLM_CACHE_TTL"], max_entries=s["LLM_CACHE_MAX_ENTRIES"], table="chat_answers"
+            ),
+        }
+        if s["QUOTA_DB_PATH"]:
+            bucket = SqliteTokenBucket(s["QUOTA_DB_PATH"], s["QUOTA_PER_MINUTE"] / 60, s["QUOTA_BURST"])
+        else:
+            bucket = TokenBucket(s["QUOTA_PER_MINUTE"] / 60, s["QUOTA_BURST"])
+        self.quota = QuotaGovernor(
+            bucket, max_wait={INTERACTIVE: s["QUOTA_INTERACTIVE_WAIT"], BACKGROUND: s["QUOTA_BACKGROUND_WAIT"]}
+        )
+        self.single_flights = {"search": SingleFlight(), "summary": SingleFlight()}
+        self.generation_stats = GenerationStats()
+        self.local_answers = LocalAnswerer()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    s = self.settings
+                    self._client = SerpApiClient(
+                        s["SERPAPI_API_KEY"],
+                        base_url=s["SERPAPI_URL"],
+                        pool_size=s["SERPAPI_POOL_SIZE"],
+                        read_timeout=s["SERPAPI_TIMEOUT"],
+                        max_retries=s["SERPAPI_MAX_RETRIES"],
+                        tracer=self.tracer,
+                    )
+        return self._client
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=self.settings["GEMINI_API_KEY"])
+                    self._model = genai.GenerativeModel(self.settings["GEMINI_MODEL"])
+        return self._model
+
+    # ---------------- SEARCH ----------------
+    def search_flights(self, params, priority=INTERACTIVE, allow_stale=True):
+        """Decoded SerpAPI response for ``params``, or None if unavailable.
+
+        Every SerpAPI call waits for a quota token at ``priority``. A call
+        shed after its bounded wait falls back to an expired cached
+        response for the same params when ``allow_stale`` and one exists.
+        Joining an identical search already in flight keeps this caller's
+        priority and deadline, see ``_join_fetch``.
+        """
+        key = cache_key(params)
+        with self.tracer.span("search", priority=priority) as span:
+            results = self.response_cache.get(key)
+            span.set("cache", "hit" if results is not None else "miss")
+            if results is None:
+                results = self.single_flights["search"].do(
+                    key, self._fetch_uncached, key, params, priority,
+                    join=lambda future: self._join_fetch(key, future, priority),
+                )
+                if results is None and allow_stale:
+                    results = self.response_cache.get_stale(key)
+                    span.set("cache", "stale" if results is not None else "miss")
+            if results is None:
+                span.fail("no results")
+        return results
+
+    def _fetch_uncached(self, key, params, priority=INTERACTIVE):
+        results = self.response_cache.get(key)
+        if results is None:
+            with self.tracer.span("quota.wait", priority=priority) as span:
+                if not self.quota.acquire(priority, tag=key):
+                    span.fail("shed")
+                    return None
+            try:
+                results = self.client.search(params)
+            except SerpApiError:
+                return None
+            self.response_cache.set(key, results)
+        return results
+
+    def _join_fetch(self, key, future, priority):
+        """Wait for another caller's fetch of ``key`` on this caller's terms.
+
+        A fetch still queued for quota is promoted to ``priority``, so a
+        user click joining a background prefetch is not served at
+        background priority. If it is still queued at this caller's own
+        deadline the caller gives up with None; once it holds a token its
+        result is awaited.
+        """
+        self.quota.promote(key, priority)
+        try:
+            return future.result(timeout=self.quota.max_wait[priority])
+        except FutureTimeout:
+            if self.quota.give_up(key, priority):
+                return None
+            return future.result()
+
+    def route_search(self, origins, destinations, date, return_date, currency):
+        """Yield ``(route, params, results)`` for every origin × destination pair as it completes.
+
+        All pairs are priced in ``currency`` so their fares compare directly.
+        """
+        parent = self.tracer.current()
+
+        def search_route(origin, destination):
+            with self.tracer.span("search.route", parent=parent, route=route_label(origin, destination)):
+                return self.search_flights(build_params(origin, destination, date, return_date, currency))
+
+        pairs = route_pairs(origins, destinations)
+        for (origin, destination), results in fan_out(
+            pairs, search_route, max_workers=self.settings["ROUTE_MAX_WORKERS"], thread_name_prefix="route-search"
+        ):
+            yield route_label(origin, destination), build_params(origin, destination, date, return_date, currency), results
+
+    def price_grid(self, from_city, to_city, date, return_date, currency, flex_days):
+        """Yield ``((outbound, return), min_price)`` per date pair as it completes."""
+        parent = self.tracer.current()
+
+        def search_cell(outbound, back):
+            with self.tracer.span("search.grid_cell", parent=parent):
+                return self.search_flights(build_params(from_city, to_city, outbound, back, currency), priority=BACKGROUND)
+
+        pairs = date_pairs(date, return_date, flex_days)
+        for (outbound, back), results in fan_out(pairs, search_cell, max_workers=self.settings["GRID_MAX_WORKERS"]):
+            yield (outbound.isoformat(), back.isoformat() if back else None), min_price(results)
+
+    # ---------------- RETURN LEGS ----------------
+    def return_legs(self, params, departure_token, priority=INTERACTIVE):
+        """Return options for one outbound of a round-trip search.
+
+        Goes through ``search_flights``, so a leg that was prefetched is a
+        cache hit and one still in flight is joined rather than refetched.
+        """
+        return self.search_flights(dict(params, departure_token=departure_token), priority=priority)
+
+    def prefetch_return_legs(self, params, departure_tokens):
+        """Warm return legs in the background on a small bounded pool."""
+        if self._prefetch_pool is None:
+            with self._lock:
+                if self._prefetch_pool is None:
+                    self._prefetch_pool = ThreadPoolExecutor(
+                        max_workers=self.settings["RETURN_PREFETCH_WORKERS"], thread_name_prefix="return-prefetch"
+                    )
+
+        def prefetch(token):
+            # A root of its own, so it is not mistaken for a user request
+            with self.tracer.span("background.return_prefetch"):
+                return self.return_legs(params, token, BACKGROUND)
+
+        return [self._prefetch_pool.submit(prefetch, token) for token in departure_tokens]
+
+    # ---------------- SUMMARY & CHAT ----------------
+    def summarize(self, flights, symbol, on_text=None):
+        """Gemini summary of the top flights, streamed through ``on_text``.
+
+        Only the caller that issues the request sees it stream; concurrent
+        callers for the same flights receive the finished text.
+        """
+        flights = flights[:TOP_FLIGHTS]
+        with self.tracer.span("summary") as span:
+            key = summary_cache_key(flight_fingerprint(flights, symbol))
+            summary_text = self.llm_caches["summary"].get(key)
+            span.set("cache", "hit" if summary_text is not None else "miss")
+            if summary_text is not None:
+                return summary_text
+
+            with self.tracer.span("summary.prompt_build"):
+                prompt = build_summary_prompt(flights, symbol)
+
+            def run():
+                with self.tracer.span("summary.generate_content") as generate:
+                    text, timings = stream_text(lambda: self.model.generate_content(prompt, stream=True), on_text)
+                    generate.set("ttft_ms", timings["ttft_ms"])
+                self.generation_stats.record("summary", timings)
+                self.llm_caches["summary"].set(key, text)
+                return text
+
+            return self.single_flights["summary"].do(key, run)
+
+    def start_chat(self, flights, symbol, summary_text):
+        """Chat context primed with the summary prompt and its answer.
+
+        No session is opened here; ``answer`` primes a fresh one per turn
+        from the context's token-budgeted history.
+        """
+        flights = flights[:TOP_FLIGHTS]
+        return ChatContext(
+            flight_fingerprint(flights, symbol),
+            build_summary_prompt(flights, symbol),
+            summary_text,
+            budget=self.settings["CHAT_CONTEXT_TOKENS"],
+            recent_turns=self.settings["CHAT_RECENT_TURNS"],
+            flights=flights,
+            symbol=symbol,
+        )
+
+    def answer(self, context, query, on_text=None, use_model=True, flights=None):
+        """Reply to ``query`` in ``context``, or None if it needs the model and ``use_model`` is off.
+
+        Factual questions about the flights ("which is cheapest?", "when
+        does option 2 land?") are answered locally from ``flights``, in the
+        order the user sees them, or from the summarized shortlist when not
+        given. Everything else reuses a cached answer for the same flights
+        and conversation so far, or goes to Gemini.
+        """
+        with self.tracer.span("chat.answer") as span:
+            with self.tracer.span("chat.local"):
+                reply = self.local_answers.answer(
+                    query, context.flights if flights is None else flights, context.symbol
+                )
+            if reply is not None:
+                span.set("source", "local")
+                context.add_turn(query, reply, source="local")
+                return reply
+            if not use_model:
+                span.set("source", "rejected")
+                return None
+
+            # Follow-ups are only reused after the same earlier turns
+            answer_key = chat_cache_key(context.fingerprint, query, context.contents() if context.turns else None)
+            reply = self.llm_caches["chat"].get(answer_key)
+            span.set("source", "cache" if reply is not None else "gemini")
+            if reply is None:
+                prompt_tokens = context.prompt_tokens(query)
+                span.set("prompt_tokens", prompt_tokens)
+                with self.tracer.span("chat.start"):
+                    chat = self.model.start_chat(history=context.contents())
+                with self.tracer.span("chat.send_message") as send:
+                    reply, timings = stream_text(lambda: chat.send_message(query, stream=True), on_text)
+                    send.set("ttft_ms", timings["ttft_ms"])
+                self.generation_stats.record("chat", timings)
+                self.llm_caches["chat"].set(answer_key, reply)
+                context.add_turn(query, reply, prompt_tokens)
+            else:
+                # Keep the context as if Gemini had answered
+                context.add_turn(query, reply, source="cache")
+        return reply
+
+    def stats(self):
+        return {
+            "response_cache": self.response_cache.stats(),
+            "quota": self.quota.stats(),
+            "serpapi_client": self._client.stats() if self._client is not None else {},
+            "coalescing": {name: flight.stats() for name, flight in self.single_flights.items()},
+            "llm_caches": {name: cache.stats() for name, cache in self.llm_caches.items()},
+            "generation": self.generation_stats.stats(),
+            "local_answers": self.local_answers.stats(),
+        }
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+
+def date_pairs(outbound_date, return_date=None, flex_days=1, today=None):
+    """All (outbound, return) date pairs within ±flex_days of the request.
+
+    One-way searches get ``None`` as the return date. Pairs where the
+    return would fall before the outbound, or the outbound before
+    ``today``, are skipped: SerpAPI cannot price them.
+    """
+    today = today or date.today()
+    offsets = range(-flex_days, flex_days + 1)
+    outbounds = [outbound_date + timedelta(days=offset) for offset in offsets]
+    outbounds = [outbound for outbound in outbounds if outbound >= today]
+    if return_date is None:
+        return [(outbound, None) for outbound in outbounds]
+    returns = [return_date + timedelta(days=offset) for offset in offsets]
+    return [(outbound, back) for outbound in outbounds for back in returns if back >= outbound]
+
+
+def min_price(results):
+    """Cheapest itinerary price in a SerpAPI response, or None."""
+    if not results:
+        return None
+    prices = [
+        flight["price"]
+        for flight in results.get("best_flights", []) + results.get("other_flights", [])
+        if isinstance(flight.get("price"), (int, float))
+    ]
+    return min(prices) if prices else None
+
+
+def fan_out(pairs, search, max_workers=4, thread_name_prefix="price-grid"):
+    """Run ``search(*pair)`` for every pair, e.g. dates or routes, on a bounded pool.
+
+    Yields ``(pair, results)`` as each cell completes so callers can draw
+    the grid progressively. A failing cell yields ``None`` rather than
+    aborting the rest of the grid.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix) as pool:
+        futures = {pool.submit(search, *pair): pair for pair in pairs}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception:
+                results = None
+            yield futures[future], results
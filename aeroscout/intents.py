@@ -0,0 +1,210 @@
+import re
+import threading
+from collections import Counter
+
+from aeroscout.llm import normalize_query
+from aeroscout.render import format_duration
+from aeroscout.routes import price_key
+
+# Anything about policies, comfort, advice or getting around on the ground
+# needs the model, even when it also mentions a price, a time or a stop
+# ("how much baggage", "is a layover worth it", "how much is a taxi")
+OPEN_ENDED = re.compile(
+    r"\b(bag|bags|baggage|luggage|cabin|cancel\w*|refund\w*|change|changes|changing|reschedul\w*|visa|"
+    r"policy|policies|include\w*|meal\w*|food|seat|seats|legroom|wifi|wi fi|lounge|pet|pets|insurance|"
+    r"check in|terminals?|gates?|immigration|customs|security|recommend\w*|should|why|worth|better|best|"
+    r"comfort\w*|amenit\w*|safe\w*|covid|tips?|advice|class|business|economy|taxi\w*|cab|cabs|uber|bus|"
+    r"buses|train|trains|metro|shuttle|transfer\w*|hotel\w*|parking|car|rental|drive)\b"
+)
+
+CHEAPEST = re.compile(r"\b(cheapest|lowest (price|fare|cost)|least expensive|most affordable)\b")
+FASTEST = re.compile(r"\b(fastest|quickest|shortest)\b")
+
+# First match wins, so attribute questions ("when does the cheapest land")
+# beat the superlatives, which in turn beat a bare price question
+INTENTS = (
+    ("nonstop_count", re.compile(
+        r"^how many ((non ?stop|direct) (flights|options)( are there)?|(flights|options) (are|is) (non ?stop|direct))$"
+    )),
+    ("count", re.compile(r"^how many (flights|options|results|itineraries)( (are|is) there| do (i|we|you) have)?$")),
+    ("stops", re.compile(r"\b(stops?|layovers?|non ?stop|direct|connections?|connecting)\b")),
+    ("arrival", re.compile(r"\b(land|lands|landing|arrive|arrives|arriving|arrival|get in|gets in|reach)\b")),
+    ("departure", re.compile(r"\b(depart\w*|leave|leaves|leaving|take off|takes off|takeoff)\b")),
+    ("duration", re.compile(r"\b(how long|duration|travel time|flight time|journey time)\b")),
+    ("airline", re.compile(r"\b(airlines?|carriers?|operates?|operated|who flies)\b")),
+    ("cheapest", CHEAPEST),
+    ("fastest", FASTEST),
+    ("price", re.compile(r"\b(how much|price|prices|cost|costs|fare|fares)\b")),
+)
+
+# Only questions that point at the shortlist are answered locally: they
+# mention flights or options, a numbered or ordinal option, or use a
+# superlative on its own ("which is the cheapest?", "the fastest one")
+FLIGHT_REF = re.compile(r"\b(flights?|options?|itinerar(y|ies)|fares|prices|ones|these|those|them)\b")
+SUPERLATIVE_REF = re.compile(
+    r"\b(cheapest|lowest (price|fare|cost)|least expensive|most affordable|fastest|quickest|shortest)(\s+ones?\b|$)"
+)
+
+# Any other count ("how many flights have stops", "... leave after 6")
+# counts a subset the patterns above cannot pick out
+COUNT_REF = re.compile(r"^how many ((non ?stop|direct) )?(flights|options|results|itineraries)\b")
+
+# Questions about every option list at most this many
+LIST_LIMIT = 5
+
+ORDINALS = {"first": 0, "second": 1, "third": 2, "fourth": 3, "fifth": 4, "1st": 0, "2nd": 1, "3rd": 2, "4th": 3, "5th": 4}
+NUMBERED = re.compile(r"\b(?:option|flight|choice|number|no|itinerary)\s*(\d+)\b")
+ORDINAL = re.compile(r"\b(first|second|third|fourth|fifth|1st|2nd|3rd|4th|5th|last)\b")
+
+
+def _duration(flight):
+    return flight.get("total_duration") or float("inf")
+
+
+def classify(query):
+    """``(intent, flight_ref)`` for a factual question, or None for the model.
+
+    ``flight_ref`` is an index into the flights, ``"cheapest"`` or
+    ``"fastest"``, or None when the question is about all of them.
+    """
+    text = normalize_query(query)
+    if not text or OPEN_ENDED.search(text):
+        return None
+    intent = next((name for name, pattern in INTENTS if pattern.search(text)), None)
+    if intent is None:
+        return None
+    if intent not in ("count", "nonstop_count") and COUNT_REF.search(text):
+        return None
+    numbered = NUMBERED.findall(text)
+    ordinal = ORDINAL.findall(text)
+    if len(set(numbered)) + len(set(ordinal)) > 1:
+        # Comparing options ("is option 1 or option 2 cheaper?") needs the model
+        return None
+    if not (numbered or ordinal or FLIGHT_REF.search(text) or SUPERLATIVE_REF.search(text)):
+        return None
+
+    ref = None
+    if intent in ("cheapest", "fastest"):
+        return intent, ref
+    if numbered:
+        ref = int(numbered[0]) - 1
+    elif ordinal:
+        ref = -1 if ordinal[0] == "last" else ORDINALS[ordinal[0]]
+    elif CHEAPEST.search(text):
+        ref = "cheapest"
+    elif FASTEST.search(text):
+        ref = "fastest"
+    return intent, ref
+
+
+def _stops_text(flight):
+    layovers = flight.get("layovers") or []
+    if not layovers:
+        return "nonstop"
+    places = ", ".join(f"{stop.get('id', '?')} ({format_duration(stop.get('duration', '?'))})" for stop in layovers)
+    return f"{len(layovers)} stop{'s' if len(layovers) > 1 else ''} via {places}"
+
+
+def _airlines(flight):
+    names = []
+    for segment in flight.get("flights", []):
+        name = segment.get("airline")
+        if name and name not in names:
+            names.append(name)
+    return " + ".join(names) or "an unknown airline"
+
+
+def _time(airport):
+    stamp = airport.get("time", "")
+    day, _, clock = stamp.rpartition(" ")
+    return f"{clock} on {day}" if day else stamp or "an unknown time"
+
+
+def _arrival(flight):
+    segments = flight.get("flights") or [{}]
+    return f"lands at {_time(segments[-1].get('arrival_airport', {}))}"
+
+
+def _departure(flight):
+    segments = flight.get("flights") or [{}]
+    return f"departs at {_time(segments[0].get('departure_airport', {}))}"
+
+
+def _describe(n, flight, symbol):
+    return (
+        f"option {n + 1} — {_airlines(flight)}, {symbol}{flight.get('price', 'N/A')}, "
+        f"{format_duration(flight.get('total_duration', '?'))}, {_stops_text(flight)}"
+    )
+
+
+def respond(intent, ref, flights, symbol):
+    """Answer text for a classified question, or None if ``ref`` points nowhere."""
+    if not flights:
+        return None
+    if ref == "cheapest" or intent == "cheapest":
+        ref = min(range(len(flights)), key=lambda i: price_key(flights[i]))
+    elif ref == "fastest" or intent == "fastest":
+        ref = min(range(len(flights)), key=lambda i: _duration(flights[i]))
+    if isinstance(ref, int):
+        if not -len(flights) <= ref < len(flights):
+            return None
+        ref %= len(flights)
+    chosen = [ref] if ref is not None else list(range(len(flights)))
+
+    def each(describe):
+        lines = [f"Option {i + 1}: {describe(flights[i])}." for i in chosen[:LIST_LIMIT]]
+        if len(chosen) > LIST_LIMIT:
+            lines.append(f"…and {len(chosen) - LIST_LIMIT} more; ask about a specific option for details.")
+        return lines[0] if len(lines) == 1 else "\n".join(f"- {line}" for line in lines)
+
+    if intent == "count":
+        return f"There are {len(flights)} options."
+    if intent == "nonstop_count":
+        nonstop = sum(1 for flight in flights if not flight.get("layovers"))
+        return f"{nonstop or 'None'} of the {len(flights)} options {'is' if nonstop == 1 else 'are'} nonstop."
+    if intent in ("cheapest", "fastest"):
+        return f"The {intent} is {_describe(ref, flights[ref], symbol)}."
+    if intent == "stops":
+        return each(_stops_text)
+    if intent == "arrival":
+        return each(_arrival)
+    if intent == "departure":
+        return each(_departure)
+    if intent == "duration":
+        return each(lambda flight: f"{format_duration(flight.get('total_duration', '?'))} in total")
+    if intent == "airline":
+        return each(_airlines)
+    if intent == "price":
+        return each(lambda flight: f"{symbol}{flight.get('price', 'N/A')}")
+    return None
+
+
+class LocalAnswerer:
+    """Answers factual questions about the shortlisted flights without Gemini.
+
+    Counts each answered intent, i.e. every model call avoided.
+    """
+
+    def __init__(self):
+        self.answered = Counter()
+        self.deferred = 0
+        self._lock = threading.Lock()
+
+    def answer(self, query, flights, symbol):
+        classified = classify(query)
+        reply = respond(*classified, flights, symbol) if classified else None
+        with self._lock:
+            if reply is None:
+                self.deferred += 1
+            else:
+                self.answered[classified[0]] += 1
+        return reply
+
+    def stats(self):
+        with self._lock:
+            avoided = sum(self.answered.values())
+            return {
+                "llm_calls_avoided": avoided,
+                "deferred_to_llm": self.deferred,
+                "by_intent": dict(self.answered),
+            }
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import deque
+
+# Bump whenever the summary prompt changes so cached summaries are not reused
+SUMMARY_PROMPT_VERSION = 1
+
+SUMMARY_POLICY_PROMPT = """
+                Summarize the following flights and include:
+                - Price, duration, stops, and airlines
+                - Baggage policy, seat comfort, amenities, and cancellation rules for each airline
+                - Recommendation for best overall, best value, and most comfortable
+                """
+
+
+def build_summary_prompt(flights, symbol):
+    """Prompt asking Gemini to compare ``flights`` priced in ``symbol``."""
+    flight_summaries = []
+    for flight in flights:
+        price = flight.get("price", "N/A")
+        duration = flight.get("total_duration", "N/A")
+        flight_type = flight.get("type", "Unknown").title()
+        segments = flight.get("flights", [])
+        seg_info = ", ".join(
+            f"{seg.get('airline', '')} from {seg.get('departure_airport', {}).get('id', '')} to {seg.get('arrival_airport', {}).get('id', '')}"
+            for seg in segments
+        )
+        flight_summaries.append(f"{flight_type} flight costing {symbol}{price}, duration {duration} minutes, segments: {seg_info}.")
+
+    return SUMMARY_POLICY_PROMPT + "\n\nFlights:\n" + "\n".join(flight_summaries)
+
+
+def flight_fingerprint(flights, symbol):
+    """Stable hash of the fields the summary prompt is built from."""
+    normalized = [
+        [
+            flight.get("price"),
+            flight.get("total_duration"),
+            flight.get("type"),
+            [
+                [
+                    segment.get("airline"),
+                    segment.get("departure_airport", {}).get("id"),
+                    segment.get("arrival_airport", {}).get("id"),
+                ]
+                for segment in flight.get("flights", [])
+            ],
+        ]
+        for flight in flights
+    ]
+    payload = json.dumps([symbol, normalized], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def summary_cache_key(fingerprint):
+    return f"summary:v{SUMMARY_PROMPT_VERSION}:{fingerprint}"
+
+
+def normalize_query(query):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def chat_cache_key(fingerprint, query, history=None):
+    """Cache key for an answer to ``query`` about the flights behind ``fingerprint``.
+
+    An opening question is keyed on the flights alone. A follow-up depends
+    on the conversation before it, so pass that ``history`` too.
+    """
+    digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+    if history:
+        payload = json.dumps(history, separators=(",", ":"), ensure_ascii=False)
+        digest += ":" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"chat:{fingerprint}:{digest}"
+
+
+def stream_text(start_stream, on_text=None, clock=time.perf_counter):
+    """Drain a streaming Gemini response, reporting progress as it arrives.
+
+    ``start_stream`` issues the request (``generate_content(..., stream=True)``
+    or ``send_message(..., stream=True)``) so its latency counts towards the
+    time to first token. ``on_text`` receives the accumulated text after
+    every chunk. Returns ``(text, timings)`` with timings in milliseconds.
+    """
+    start = clock()
+    first_token = None
+    parts = []
+    for chunk in start_stream():
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks carrying only safety or finish metadata have no text
+            continue
+        if first_token is None:
+            first_token = clock()
+        parts.append(text)
+        if on_text is not None:
+            on_text("".join(parts))
+    end = clock()
+    timings = {
+        "ttft_ms": round(((first_token or end) - start) * 1000, 1),
+        "total_ms": round((end - start) * 1000, 1),
+    }
+    return "".join(parts), timings
+
+
+class GenerationStats:
+    """Rolling record of time-to-first-token and total generation time."""
+
+    def __init__(self, maxlen=200):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=maxlen)
+
+    def record(self, kind, timings):
+        with self._lock:
+            self._records.append(dict(timings, kind=kind, at=time.time()))
+
+    def recent(self, limit=10):
+        with self._lock:
+            return list(self._records)[-limit:]
+
+    def stats(self):
+        with self._lock:
+            records = list(self._records)
+        summary = {}
+        for kind in sorted({record["kind"] for record in records}):
+            ttft = sorted(record["ttft_ms"] for record in records if record["kind"] == kind)
+            total = sorted(record["total_ms"] for record in records if record["kind"] == kind)
+            summary[kind] = {
+                "count": len(ttft),
+                "ttft_p50_ms": ttft[len(ttft) // 2],
+                "total_p50_ms": total[len(total) // 2],
+                "total_max_ms": total[-1],
+            }
+        return summary
@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+
+# Lower runs first: a user waiting on the page beats prefetch, grids and watches
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class TokenBucket:
+    """In-process token bucket: ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self):
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def available(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def wait_time(self):
+        """Seconds until the next whole token, assuming nobody else takes it."""
+        return max(0.0, (1 - self.available()) / self.rate)
+
+
+class SqliteTokenBucket(TokenBucket):
+    """Token bucket whose state lives in SQLite, shared by every process using ``path``.
+
+    Each take is one ``BEGIN IMMEDIATE`` transaction, so concurrent Streamlit
+    workers and batch jobs draw from the same quota without double spending.
+    Wall-clock time is used because monotonic clocks are per process.
+    """
+
+    def __init__(self, path, rate, capacity, name="serpapi", clock=time.time):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.name = name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                (name, float(capacity), clock()),
+            )
+
+    def _transact(self, take):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated = self._conn.execute(
+                    "SELECT tokens, updated FROM token_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = self.clock()
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                taken = take and tokens >= 1
+                if taken:
+                    tokens -= 1
+                self._conn.execute(
+                    "UPDATE token_buckets SET tokens = ?, updated = ? WHERE name = ?", (tokens, now, self.name)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return taken, tokens
+
+    def try_take(self):
+        return self._transact(take=True)[0]
+
+    def available(self):
+        return self._transact(take=False)[1]
+
+
+class QuotaGovernor:
+    """Priority queue in front of a token bucket.
+
+    ``acquire`` grants a token to the highest-priority, longest-waiting
+    caller first, so background work only spends quota no interactive
+    search is waiting for. Callers give up after their priority's
+    ``max_wait`` seconds and are counted as shed; the caller decides how to
+    degrade (the engine falls back to a stale cached response).
+
+    A waiter can be ``tag``-ged, e.g. with the cache key of the search it
+    is for, so that callers sharing that search can ``promote`` it to their
+    own priority or ``give_up`` on it at their own deadline.
+    """
+
+    def __init__(self, bucket, max_wait=None, clock=time.monotonic):
+        self.bucket = bucket
+        self.max_wait = {INTERACTIVE: 5.0, BACKGROUND: 30.0}
+        self.max_wait.update(max_wait or {})
+        self.clock = clock
+        self.granted = {priority: 0 for priority in PRIORITY_NAMES}
+        self.shed = {priority: 0 for priority in PRIORITY_NAMES}
+        self._waiters = []
+        self._tagged = {}
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, priority=INTERACTIVE, timeout=None, tag=None):
+        """Block until a token is granted; False if none came in time.
+
+        The deadline, and the priority the grant or shed is counted at,
+        stay this caller's own even if the wait is promoted.
+        """
+        timeout = self.max_wait[priority] if timeout is None else timeout
+        deadline = self.clock() + timeout
+        # A list so ``promote`` can change the priority in place
+        ticket = [priority, next(self._sequence)]
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            if tag is not None:
+                self._tagged[tag] = ticket
+            try:
+                while True:
+                    if self._waiters[0] is ticket and self.bucket.try_take():
+                        self.granted[priority] += 1
+                        return True
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.shed[priority] += 1
+                        return False
+                    # Wake for the next token, or sooner if the queue changes
+                    self._cond.wait(min(remaining, max(self.bucket.wait_time(), 0.01)))
+            finally:
+                if tag is not None and self._tagged.get(tag) is ticket:
+                    del self._tagged[tag]
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def promote(self, tag, priority):
+        """Raise the queued wait tagged ``tag`` to ``priority``; False if none is queued."""
+        with self._cond:
+            ticket = self._tagged.get(tag)
+            if ticket is None:
+                return False
+            if priority < ticket[0]:
+                ticket[0] = priority
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+            return True
+
+    def give_up(self, tag, priority):
+        """Stop relying on the wait tagged ``tag``, counted as shed at ``priority``.
+
+        Returns False, counting nothing, if that wait already ended.
+        """
+        with self._cond:
+            if tag not in self._tagged:
+                return False
+            self.shed[priority] += 1
+            return True
+
+    def stats(self):
+        with self._cond:
+            queued = [ticket[0] for ticket in self._waiters]
+        return {
+            "tokens_remaining": round(self.bucket.available(), 2),
+            "capacity": self.bucket.capacity,
+            "refill_per_minute": round(self.bucket.rate * 60, 2),
+            "queue_depth": {name: queued.count(priority) for priority, name in PRIORITY_NAMES.items()},
+            "granted": {name: self.granted[priority] for priority, name in PRIORITY_NAMES.items()},
+            "shed": {name: self.shed[priority] for priority, name in PRIORITY_NAMES.items()},
+        }
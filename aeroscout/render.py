@@ -0,0 +1,43 @@
+def format_duration(duration):
+    """Render a minute count as ``"2h 15m"``, passing through odd values."""
+    try:
+        mins = int(duration)
+    except (TypeError, ValueError):
+        return f"{duration} min"
+    return f"{mins // 60}h {mins % 60}m"
+
+
+def render_card(flight, symbol):
+    """HTML for one itinerary card, styled by the ``.flight-card`` CSS."""
+    price = flight.get("price", "N/A")
+    flight_type = flight.get("type", "Unknown").title()
+
+    segment_items = []
+    for seg in flight.get("flights", []):
+        airline = seg.get("airline", "Unknown Airline")
+        dep = seg.get("departure_airport", {})
+        arr = seg.get("arrival_airport", {})
+        segment_items.append(f"<li><strong>{airline}</strong>: {dep.get('name', '')} ({dep.get('id', '')}) {dep.get('time', '')} → {arr.get('name', '')} ({arr.get('id', '')}) {arr.get('time', '')}</li>")
+
+    segments_html = "<ul>" + "".join(segment_items) + "</ul>"
+
+    details_html = ""
+    layovers = flight.get("layovers", [])
+    if layovers:
+        stops = ", ".join(f"{stop.get('id', '')} ({format_duration(stop.get('duration', '?'))})" for stop in layovers)
+        details_html += f"<p><strong>Layovers:</strong> {stops}</p>"
+    emissions = flight.get("carbon_emissions") or {}
+    if emissions.get("this_flight"):
+        details_html += f"<p><strong>CO₂:</strong> {emissions['this_flight'] // 1000} kg"
+        if emissions.get("difference_percent") is not None:
+            details_html += f" ({int(emissions['difference_percent']):+d}% vs typical)"
+        details_html += "</p>"
+
+    return f"""
+    <div class="flight-card">
+        <h4>✈️ <strong>{flight_type}</strong> - <span style="color:#0a9396;">{symbol}{price}</span></h4>
+        <p><strong>Total Duration:</strong> {format_duration(flight.get("total_duration", "N/A"))}</p>
+        {details_html}
+        {segments_html}
+    </div>
+    """
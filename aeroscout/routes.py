@@ -0,0 +1,34 @@
+import heapq
+import math
+from itertools import islice
+
+
+def route_pairs(origins, destinations):
+    """Every origin × destination pair, skipping an airport paired with itself."""
+    return [(origin, destination) for origin in origins for destination in destinations if origin != destination]
+
+
+def route_label(origin, destination):
+    return f"{origin}-{destination}"
+
+
+def price_key(flight):
+    """Sort key for an itinerary's price; unpriced ones rank last."""
+    price = flight.get("price")
+    return price if isinstance(price, (int, float)) else math.inf
+
+
+def cheapest(result_sets, k, groups=("best_flights",)):
+    """The ``k`` cheapest itineraries across several SerpAPI responses.
+
+    Each response contributes only its own ``k`` cheapest (a bounded heap
+    per response), and those short sorted runs are merged lazily, so
+    nothing is concatenated and sorted as a whole. Unpriced itineraries
+    rank last.
+    """
+    runs = [
+        heapq.nsmallest(k, (flight for group in groups for flight in results.get(group, [])), key=price_key)
+        for results in result_sets
+        if results
+    ]
+    return list(islice(heapq.merge(*runs, key=price_key), k))
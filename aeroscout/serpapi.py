@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from aeroscout.tracing import Tracer
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SerpApiError(Exception):
+    """Raised when SerpAPI cannot produce a usable response."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SerpApiClient:
+    """Pooled, retrying client for the SerpAPI search endpoint.
+
+    One instance is meant to live for the whole process: the underlying
+    ``requests.Session`` keeps connections alive between searches and the
+    pool is bounded so a burst of sessions cannot open unlimited sockets.
+    Transient failures (timeouts, connection and transfer errors, 429 and
+    5xx) are retried with capped exponential backoff and full jitter.
+    """
+
+    def __init__(self, api_key, base_url=SERPAPI_URL, pool_size=10, connect_timeout=3.05,
+                 read_timeout=20, max_retries=3, backoff=0.5, max_backoff=8.0, sleep=time.sleep, tracer=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.tracer = tracer or Tracer()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=500)
+
+    def search(self, params):
+        """Run one search and return the decoded JSON payload."""
+        params = dict(params, api_key=self.api_key)
+        start = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    with self.tracer.span("serpapi.request", attempt=attempt) as span:
+                        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                        span.set("http.status_code", response.status_code)
+                        if response.status_code != 200:
+                            span.fail(f"HTTP {response.status_code}")
+                except requests.RequestException as exc:
+                    # Also covers bodies cut off or garbled mid-transfer (ChunkedEncodingError, ContentDecodingError)
+                    if attempt >= self.max_retries:
+                        # The exception text embeds the URL, and with it the API key
+                        raise SerpApiError(f"SerpAPI unreachable ({type(exc).__name__})") from exc
+                    retry_after = None
+                else:
+                    if response.status_code == 200:
+                        with self.tracer.span("serpapi.decode", bytes=len(response.content)):
+                            try:
+                                return response.json()
+                            except ValueError as exc:
+                                # Not retried: the same request would most likely get the same body
+                                raise SerpApiError("SerpAPI returned a malformed body", status_code=200) from exc
+                    if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                        raise SerpApiError(
+                            f"SerpAPI returned HTTP {response.status_code}", status_code=response.status_code
+                        )
+                    retry_after = response.headers.get("Retry-After")
+                attempt += 1
+                self.sleep(self._delay(attempt, retry_after))
+        except SerpApiError:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.requests += 1
+                self.retries += attempt
+                self._latencies.append(time.perf_counter() - start)
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {"requests": self.requests, "retries": self.retries, "failures": self.failures}
+        if latencies:
+            stats["latency_p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 1)
+            stats["latency_p95_ms"] = round(latencies[int(len(latencies) * 0.95)] * 1000, 1)
+            stats["latency_last_ms"] = round(self._latencies[-1] * 1000, 1)
+        return stats
+
+    def close(self):
+        self.session.close()
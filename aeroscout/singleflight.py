@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import Future
+
+
+class _Abandoned(Exception):
+    """Published to waiters when the leader was interrupted rather than failed."""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block on the same future and get its result or exception. The
+    key is released before the outcome is published, so a failure is only
+    seen by the callers that were already waiting and the next call retries.
+    A ``join`` callable, given the leader's future, replaces the plain wait
+    for callers that join, e.g. to bound how long they wait.
+
+    Only an ``Exception`` is shared. If the leader is interrupted by any
+    other ``BaseException`` (e.g. Streamlit stopping its script to rerun
+    it), that belongs to the leader's thread alone: the waiters call
+    ``do`` again and one of them runs ``fn`` as the new leader.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def do(self, key, fn, *args, join=None, **kwargs):
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._in_flight[key] = future
+                    self.calls += 1
+                else:
+                    self.shared += 1
+            if leader:
+                break
+            try:
+                return join(future) if join is not None else future.result()
+            except _Abandoned:
+                continue
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._release(key)
+            future.set_exception(exc)
+            raise
+        except BaseException:
+            self._release(key)
+            future.set_exception(_Abandoned())
+            raise
+        self._release(key)
+        future.set_result(result)
+        return result
+
+    def _release(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def stats(self):
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._in_flight)}
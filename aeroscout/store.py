@@ -0,0 +1,153 @@
+import math
+import sys
+from array import array
+
+SORT_KEYS = ("price", "duration", "departure", "stops", "emissions")
+
+
+def _departure_minutes(flight):
+    """Minutes after midnight of the first segment's departure, or -1."""
+    segments = flight.get("flights") or [{}]
+    time_text = segments[0].get("departure_airport", {}).get("time", "")
+    try:
+        hours, minutes = time_text.rsplit(" ", 1)[-1].split(":")
+        return int(hours) * 60 + int(minutes)
+    except ValueError:
+        return -1
+
+
+class FlightStore:
+    """Column-oriented view over every itinerary in a SerpAPI response.
+
+    ``best_flights`` and ``other_flights`` are normalized once into typed
+    ``array`` columns (price, duration, stops, departure minute, CO₂) plus
+    per-itinerary tuples of interned airline codes, so filtering and
+    sorting touch compact numeric data rather than nested dicts. The raw
+    itinerary dicts are kept only to render cards.
+
+    A store can hold several routes (see ``add``); each itinerary keeps the
+    interned ``route`` label it was searched under.
+    """
+
+    def __init__(self, results=None, route=""):
+        self.price_insights = {}
+        self.flights = []
+        self.groups = []
+        self.prices = array("d")
+        self.durations = array("l")
+        self.stops = array("b")
+        self.departures = array("h")
+        self.emissions = array("l")
+        self.airlines = []
+        self.routes = []
+        if results is not None:
+            self.add(results, route)
+
+    def add(self, results, route=""):
+        """Append every itinerary of another response, e.g. one more route.
+
+        Google's price insights describe a single route, so they are kept
+        only while the store holds one.
+        """
+        results = results or {}
+        route = sys.intern(route)
+        known = self.route_names()
+        if not known:
+            self.price_insights = results.get("price_insights") or {}
+        elif known != [route]:
+            self.price_insights = {}
+        for group in ("best_flights", "other_flights"):
+            for flight in results.get(group, []):
+                self._append(group, flight, route)
+
+    def _append(self, group, flight, route):
+        price = flight.get("price")
+        segments = flight.get("flights", [])
+        self.flights.append(flight)
+        self.routes.append(route)
+        self.groups.append(sys.intern(group))
+        self.prices.append(float(price) if isinstance(price, (int, float)) else math.nan)
+        self.durations.append(int(flight.get("total_duration") or 0))
+        self.stops.append(max(len(segments) - 1, 0))
+        self.departures.append(_departure_minutes(flight))
+        self.emissions.append(int((flight.get("carbon_emissions") or {}).get("this_flight") or 0))
+        self.airlines.append(tuple(sys.intern(seg.get("airline", "")) for seg in segments))
+
+    def __len__(self):
+        return len(self.flights)
+
+    def route_names(self):
+        return sorted(set(self.routes))
+
+    def airline_names(self):
+        return sorted({name for names in self.airlines for name in names if name})
+
+    def price_range(self):
+        prices = [price for price in self.prices if not math.isnan(price)]
+        return (min(prices), max(prices)) if prices else (0.0, 0.0)
+
+    def duration_range(self):
+        durations = [duration for duration in self.durations if duration]
+        return (min(durations), max(durations)) if durations else (0, 0)
+
+    def query(self, max_stops=None, airlines=None, max_duration=None, departure_window=None,
+              max_price=None, sort_by="price", routes=None):
+        """Indices of matching itineraries, ordered by ``sort_by``.
+
+        ``airlines`` keeps itineraries flown entirely by the given carriers
+        and ``routes`` those searched under the given route labels;
+        ``departure_window`` is a ``(start, end)`` pair of minutes after
+        midnight. Itineraries without a price sort last; any ``max_price``
+        excludes them.
+        """
+        airlines = set(airlines) if airlines else None
+        routes = set(routes) if routes else None
+        matches = []
+        for i in range(len(self.flights)):
+            if max_stops is not None and self.stops[i] > max_stops:
+                continue
+            if max_price is not None and not self.prices[i] <= max_price:
+                continue
+            if max_duration is not None and self.durations[i] > max_duration:
+                continue
+            if departure_window is not None and not departure_window[0] <= self.departures[i] <= departure_window[1]:
+                continue
+            if airlines is not None and not airlines.issuperset(self.airlines[i]):
+                continue
+            if routes is not None and self.routes[i] not in routes:
+                continue
+            matches.append(i)
+
+        if sort_by == "price":
+            matches.sort(key=self._price_key)
+        elif sort_by == "duration":
+            matches.sort(key=self.durations.__getitem__)
+        elif sort_by == "departure":
+            matches.sort(key=self.departures.__getitem__)
+        elif sort_by == "stops":
+            matches.sort(key=lambda i: (self.stops[i], self._price_key(i)))
+        elif sort_by == "emissions":
+            matches.sort(key=self.emissions.__getitem__)
+        else:
+            raise ValueError(f"unknown sort key: {sort_by!r}")
+        return matches
+
+    def _price_key(self, i):
+        # NaN compares false both ways, which would leave unpriced itineraries wherever they fell
+        return math.isnan(self.prices[i]), self.prices[i]
+
+    def departure_tokens(self, indices, limit):
+        """``departure_token`` of the first ``limit`` itineraries that have one."""
+        tokens = []
+        for i in indices:
+            token = self.flights[i].get("departure_token")
+            if token:
+                tokens.append(token)
+                if len(tokens) == limit:
+                    break
+        return tokens
+
+    def page(self, indices, page, page_size=5):
+        """Raw itinerary dicts for one 1-based page of ``indices``."""
+        start = (page - 1) * page_size
+        return [self.flights[i] for i in indices[start:start + page_size]]
@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is off; every operation does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, key, value):
+        pass
+
+    def fail(self, message):
+        pass
+
+    def end(self, error=None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed stage. Use as a context manager or call ``end()`` yourself."""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "attributes",
+                 "start_ns", "end_ns", "error", "_perf_start", "duration_ms")
+
+    def __init__(self, tracer, name, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self.duration_ms = None
+        self._perf_start = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(error=f"{exc_type.__name__}: {exc}" if exc_type else None)
+        return False
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def fail(self, message):
+        """Mark the span as failed without raising, e.g. for an HTTP error status."""
+        self.error = message
+
+    def end(self, error=None):
+        if self.end_ns is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._perf_start) * 1000
+        self.end_ns = self.start_ns + int(self.duration_ms * 1e6)
+        self.error = error or self.error
+        self.tracer._finish(self)
+
+    def to_dict(self):
+        """Finished span as one OTLP/JSON-shaped record."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": dict(self.attributes),
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"},
+        }
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(records, service_name="aeroscout"):
+    """Wrap span records in an OTLP/JSON ``resourceSpans`` payload for a collector."""
+    spans = [
+        dict(
+            record,
+            kind="SPAN_KIND_INTERNAL",
+            attributes=[{"key": key, "value": _otlp_value(value)} for key, value in record["attributes"].items()],
+        )
+        for record in records
+    ]
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "aeroscout"}, "spans": spans}],
+        }]
+    }
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Tracer:
+    """Minimal span tracer with an in-memory ring buffer.
+
+    Disabled, ``span`` and ``start_span`` hand back a shared no-op object,
+    so instrumented code pays one attribute check per stage. Enabled,
+    finished spans go to a ring of the last ``capacity`` spans and, when
+    ``export_path`` is set, are appended to it as JSON lines in the OTLP
+    span shape. Parents are tracked per thread; work handed to a pool
+    passes ``parent=tracer.current()`` explicitly.
+    """
+
+    def __init__(self, enabled=False, capacity=2048, export_path=None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        if not self.enabled:
+            return None
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start_span(self, name, parent=None, **attributes):
+        """Open a span that stays current on this thread until ``end()``."""
+        if not self.enabled:
+            return NOOP_SPAN
+        span = Span(self, name, parent or self.current(), attributes)
+        self._stack().append(span)
+        return span
+
+    span = start_span
+
+    def _finish(self, span):
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+        record = span.to_dict()
+        with self._lock:
+            self._spans.append(record)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def records(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def stage_stats(self, records=None):
+        """Count, error rate and p50/p95/p99/max milliseconds per span name."""
+        durations = {}
+        errors = {}
+        for record in self.records() if records is None else records:
+            name = record["name"]
+            durations.setdefault(name, []).append(duration_ms(record))
+            errors[name] = errors.get(name, 0) + (record["status"]["code"] == "STATUS_CODE_ERROR")
+        stats = {}
+        for name in sorted(durations):
+            values = sorted(durations[name])
+            stats[name] = {
+                "count": len(values),
+                "error_rate": round(errors[name] / len(values), 4),
+                "p50_ms": round(_percentile(values, 0.50), 2),
+                "p95_ms": round(_percentile(values, 0.95), 2),
+                "p99_ms": round(_percentile(values, 0.99), 2),
+                "max_ms": round(values[-1], 2),
+            }
+        return stats
+
+    def slowest(self, limit=10, records=None, prefix="request."):
+        """Slowest root spans named ``prefix…`` (whole user requests), each with its finished child spans.
+
+        Background work such as prefetches and price-watch polls has roots
+        of its own and is left out.
+        """
+        records = self.records() if records is None else records
+        roots = sorted(
+            (r for r in records if not r["parentSpanId"] and r["name"].startswith(prefix)),
+            key=duration_ms, reverse=True,
+        )[:limit]
+        by_trace = {}
+        for record in records:
+            if record["parentSpanId"]:
+                by_trace.setdefault(record["traceId"], []).append(record)
+        return [
+            (root, sorted(by_trace.get(root["traceId"], []), key=lambda r: int(r["startTimeUnixNano"])))
+            for root in roots
+        ]
+
+
+def duration_ms(record):
+    return (int(record["endTimeUnixNano"]) - int(record["startTimeUnixNano"])) / 1e6
@@ -0,0 +1,247 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import date
+
+from aeroscout.cache import cache_key
+from aeroscout.grid import min_price
+
+
+class PriceHistory:
+    """SQLite store for watched routes and the price points polled for them.
+
+    A watch is identified by the cache key of its search params, so users
+    watching the same route and dates share one watch (and one poll) and
+    are tracked as subscribers of it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS watches (
+                    key TEXT PRIMARY KEY,
+                    params TEXT NOT NULL,
+                    route TEXT NOT NULL,
+                    outbound_date TEXT NOT NULL,
+                    next_due REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS watch_subscribers (
+                    key TEXT NOT NULL,
+                    subscriber TEXT NOT NULL,
+                    PRIMARY KEY (key, subscriber)
+                );
+                CREATE TABLE IF NOT EXISTS prices (
+                    key TEXT NOT NULL,
+                    observed_at REAL NOT NULL,
+                    price REAL
+                );
+                CREATE INDEX IF NOT EXISTS watches_due ON watches (next_due);
+                CREATE INDEX IF NOT EXISTS prices_key ON prices (key, observed_at);
+                """
+            )
+
+    @staticmethod
+    def route(params):
+        return f"{params['departure_id'].upper()}-{params['arrival_id'].upper()}"
+
+    def add_watch(self, params, subscriber, due=0.0):
+        """Subscribe to ``params``; returns ``(key, created)``.
+
+        The watch is created on first subscription; later subscribers join it.
+        """
+        key = cache_key(params)
+        with self._lock, self._conn:
+            created = self._conn.execute(
+                "INSERT OR IGNORE INTO watches (key, params, route, outbound_date, next_due) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(params, sort_keys=True), self.route(params), params["outbound_date"], due),
+            ).rowcount == 1
+            self._conn.execute(
+                "INSERT OR IGNORE INTO watch_subscribers (key, subscriber) VALUES (?, ?)", (key, subscriber)
+            )
+        return key, created
+
+    def remove_watch(self, params, subscriber):
+        """Unsubscribe; the watch itself goes away with its last subscriber."""
+        key = cache_key(params)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM watch_subscribers WHERE key = ? AND subscriber = ?", (key, subscriber))
+            self._conn.execute(
+                "DELETE FROM watches WHERE key = ? AND NOT EXISTS (SELECT 1 FROM watch_subscribers WHERE key = ?)",
+                (key, key),
+            )
+
+    def is_watching(self, params, subscriber):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM watch_subscribers WHERE key = ? AND subscriber = ?", (cache_key(params), subscriber)
+            ).fetchone()
+        return row is not None
+
+    def due_watches(self, now):
+        """``(key, params)`` for every watch due at ``now``, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, params FROM watches WHERE next_due <= ? ORDER BY next_due", (now,)
+            ).fetchall()
+        return [(key, json.loads(params)) for key, params in rows]
+
+    def reschedule(self, key, next_due):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE watches SET next_due = ? WHERE key = ?", (next_due, key))
+
+    def drop_expired(self, today):
+        """Remove watches whose outbound date has passed; returns how many."""
+        with self._lock, self._conn:
+            keys = [
+                key for (key,) in self._conn.execute(
+                    "SELECT key FROM watches WHERE outbound_date < ?", (today.isoformat(),)
+                )
+            ]
+            for key in keys:
+                self._conn.execute("DELETE FROM watches WHERE key = ?", (key,))
+                self._conn.execute("DELETE FROM watch_subscribers WHERE key = ?", (key,))
+        return len(keys)
+
+    def record(self, key, price, observed_at):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO prices (key, observed_at, price) VALUES (?, ?, ?)", (key, observed_at, price)
+            )
+
+    def history(self, params):
+        """``(observed_at, price)`` points for the watch on ``params``, oldest first.
+
+        Keyed like the watch, so one-way and round-trip searches, or the
+        same route in another currency, each get their own trend.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT observed_at, price FROM prices WHERE key = ? ORDER BY observed_at", (cache_key(params),)
+            ).fetchall()
+
+    def stats(self):
+        with self._lock:
+            watches = self._conn.execute("SELECT COUNT(*) FROM watches").fetchone()[0]
+            subscribers = self._conn.execute("SELECT COUNT(*) FROM watch_subscribers").fetchone()[0]
+            points = self._conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        return {"watches": watches, "subscriptions": subscribers, "price_points": points}
+
+
+class WatchScheduler:
+    """Polls due watches off the Streamlit rerun loop.
+
+    Each poll reschedules its watch ``interval`` seconds ahead, spread by
+    ``± jitter`` (a fraction of the interval) so watches added together do
+    not stay in lockstep. A failed or shed poll is retried after
+    ``retry_delay`` seconds, doubling per consecutive failure up to the
+    interval. At most ``polls_per_hour`` searches run in any rolling hour
+    across all watches; anything beyond waits for the next pass. ``clock``
+    and ``today`` are injectable so passes can be driven deterministically
+    with ``run_pending``.
+    """
+
+    def __init__(self, history, search, interval=6 * 3600, jitter=0.1, polls_per_hour=30, retry_delay=300,
+                 tick=30, clock=time.time, today=date.today, seed=None):
+        self.history = history
+        self.search = search
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.polls_per_hour = polls_per_hour
+        self.tick = tick
+        self.clock = clock
+        self.today = today
+        self.polls = 0
+        self.failures = 0
+        self.deferred = 0
+        self._random = random.Random(seed)
+        self._recent = deque()
+        self._failing = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _next_due(self, now):
+        spread = self.interval * self.jitter
+        return now + self.interval + self._random.uniform(-spread, spread)
+
+    def _retry_due(self, key, now):
+        failures = self._failing[key] = self._failing.get(key, 0) + 1
+        return now + min(self.interval, self.retry_delay * 2 ** (failures - 1))
+
+    def subscribe(self, params, subscriber, current_price=None):
+        """Watch ``params``, seeding a new watch's history with a price already in hand.
+
+        With ``current_price`` the first poll is a full interval away;
+        without it the watch is polled on the next pass. Joining an
+        existing watch leaves its schedule and history untouched.
+        """
+        now = self.clock()
+        if current_price is None:
+            return self.history.add_watch(params, subscriber, due=now)[0]
+        key, created = self.history.add_watch(params, subscriber, due=self._next_due(now))
+        if created:
+            self.history.record(key, current_price, now)
+        return key
+
+    def run_pending(self):
+        """Poll every due watch the hourly budget allows; returns polls made."""
+        now = self.clock()
+        self.history.drop_expired(self.today())
+        while self._recent and self._recent[0] <= now - 3600:
+            self._recent.popleft()
+
+        polled = 0
+        due = self.history.due_watches(now)
+        for i, (key, params) in enumerate(due):
+            if len(self._recent) >= self.polls_per_hour:
+                self.deferred += len(due) - i
+                break
+            self._recent.append(now)
+            self.polls += 1
+            polled += 1
+            try:
+                results = self.search(params)
+            except Exception:
+                results = None
+            if results is None:
+                self.failures += 1
+                self.history.reschedule(key, self._retry_due(key, now))
+            else:
+                self._failing.pop(key, None)
+                self.history.record(key, min_price(results), now)
+                self.history.reschedule(key, self._next_due(now))
+        return polled
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="price-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                # A broken pass must not kill the scheduler thread
+                self.failures += 1
+            self._stop.wait(self.tick)
+
+    def stats(self):
+        return dict(
+            self.history.stats(),
+            polls=self.polls,
+            failures=self.failures,
+            deferred=self.deferred,
+            polls_last_hour=len(self._recent),
+        )
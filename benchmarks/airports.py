@@ -0,0 +1,103 @@
+"""Load-time and lookup-latency benchmark for the bundled airport catalog.
+
+    python -m benchmarks.airports --repeat 5 --synthetic 10000
+
+``--synthetic N`` pads the real catalog with generated airports up to N
+rows, to check the index still scales past the bundled data set.
+"""
+
+import argparse
+import csv
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+from aeroscout.airports import CATALOG_PATH, AirportCatalog
+from benchmarks.pipeline import latency_summary
+
+QUERIES = ["DEL", "LH", "J", "lond", "new york", "heath", "san", "mumbai", "zzz", "frankfurt am"]
+
+
+def load_rows():
+    with open(CATALOG_PATH, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)
+        return list(reader)
+
+
+def pad_rows(rows, size, seed=0):
+    """Add made-up airports with unused codes until there are ``size`` rows."""
+    rng = random.Random(seed)
+    taken = {row[0] for row in rows}
+    rows = list(rows)
+    while len(rows) < size:
+        code = "".join(rng.choices(string.ascii_uppercase, k=3))
+        if code in taken:
+            # Three letters only give 17,576 codes; reuse-free padding stops there
+            if len(taken) >= 26 ** 3:
+                break
+            continue
+        taken.add(code)
+        city = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))).title()
+        rows.append([code, f"{city} Airport", city, "ZZ", "USD", "0", "0"])
+    return rows
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(repeat=5, synthetic=0, lookups=20000, seed=0):
+    rows = load_rows()
+    if synthetic:
+        rows = pad_rows(rows, synthetic, seed)
+
+    csv_load = timed(AirportCatalog.from_csv, repeat) if not synthetic else []
+    build = timed(lambda: AirportCatalog(rows), repeat)
+
+    tracemalloc.start()
+    catalog = AirportCatalog(rows)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = random.Random(seed)
+    codes = [rng.choice(catalog.codes) for _ in range(lookups)]
+    start = time.perf_counter()
+    for code in codes:
+        catalog.currency(code)
+    currency_ns = (time.perf_counter() - start) / lookups * 1e9
+
+    search = {query: latency_summary(timed(lambda: catalog.search(query), 200)) for query in QUERIES}
+
+    return {
+        "airports": len(catalog),
+        "index_keys": len(catalog._name_keys),
+        "memory_bytes": memory,
+        "csv_load": latency_summary(csv_load),
+        "build_from_rows": latency_summary(build),
+        "currency_lookup_ns": round(currency_ns, 1),
+        "search": search,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="catalog loads to time")
+    parser.add_argument("--synthetic", type=int, default=0, help="pad the catalog to this many airports")
+    parser.add_argument("--lookups", type=int, default=20000, help="random currency lookups to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run(repeat=args.repeat, synthetic=args.synthetic, lookups=args.lookups, seed=args.seed)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
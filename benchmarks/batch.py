@@ -0,0 +1,90 @@
+"""Throughput of the batch CLI against the local SerpAPI stub.
+
+    python -m benchmarks.batch --routes 2000 --workers 16 --latency-ms 200
+
+Writes a synthetic routes CSV, sweeps it with ``aeroscout.batch.run`` and
+reports searches per second. A second pass over the same output checks
+that resuming skips every finished search without calling upstream.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from aeroscout.batch import run as run_batch
+from aeroscout.engine import Engine
+from benchmarks.stubs import StubSerpApi
+
+AIRPORTS = ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "PNQ", "GOI", "AMD", "COK", "JAI", "LKO"]
+
+
+def write_routes(path, count, seed=0):
+    rng = random.Random(seed)
+    start = date.today() + timedelta(days=14)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["origin", "destination", "date"])
+        for i in range(count):
+            origin, destination = rng.sample(AIRPORTS, 2)
+            writer.writerow([origin, destination, (start + timedelta(days=i % 90)).isoformat()])
+
+
+def run(routes=500, workers=8, latency=0.2, error_rate=0.0, quota_per_minute=60000.0, seed=0):
+    workdir = tempfile.mkdtemp(prefix="aeroscout-batch-")
+    routes_path = os.path.join(workdir, "routes.csv")
+    output_path = os.path.join(workdir, "results.jsonl")
+    write_routes(routes_path, routes, seed)
+
+    with StubSerpApi(latency=latency, jitter=latency / 4, error_rate=error_rate, seed=seed) as stub:
+        def engine():
+            return Engine({
+                "SERPAPI_API_KEY": "offline",
+                "SERPAPI_URL": stub.url,
+                "SERPAPI_POOL_SIZE": workers,
+                "QUOTA_PER_MINUTE": quota_per_minute,
+                "QUOTA_BURST": workers,
+            })
+
+        first = run_batch(routes_path, output_path, engine(), workers=workers, restart=True)
+        first["upstream_calls"] = stub.hits
+        # A fresh engine, as after a crash: only the output file carries over
+        resumed = run_batch(routes_path, output_path, engine(), workers=workers)
+        resumed["upstream_calls"] = stub.hits - first["upstream_calls"]
+
+    return {
+        "config": {
+            "routes": routes,
+            "workers": workers,
+            "upstream_latency_ms": latency * 1000,
+            "error_rate": error_rate,
+            "quota_per_minute": quota_per_minute,
+        },
+        "sweep": first,
+        "resume": resumed,
+        "output": output_path,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=500, help="rows in the synthetic routes CSV")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent searches")
+    parser.add_argument("--latency-ms", type=float, default=200, help="stub SerpAPI latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests answered with 503")
+    parser.add_argument("--quota-per-minute", type=float, default=60000, help="SerpAPI quota refill rate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run(
+        routes=args.routes, workers=args.workers, latency=args.latency_ms / 1000,
+        error_rate=args.error_rate, quota_per_minute=args.quota_per_minute, seed=args.seed,
+    )
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Precision and latency of the local chat answerer on a labelled query set.
+
+    python -m benchmarks.intents --repeat 200
+
+Each query in ``fixtures/intent_queries.json`` is labelled with the
+intent and flight reference it should resolve to, or ``null`` when only
+Gemini can answer it. Precision counts local answers with the right
+intent and flight; ``open_ended_answered_locally`` are questions that
+should have reached the model and did not.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from aeroscout.intents import LocalAnswerer, classify
+from benchmarks.pipeline import latency_summary
+from benchmarks.stubs import load_fixture
+
+QUERIES_PATH = Path(__file__).parent / "fixtures" / "intent_queries.json"
+
+
+def load_queries(path=QUERIES_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run(repeat=200, path=QUERIES_PATH):
+    labelled = load_queries(path)
+    flights = load_fixture()["best_flights"]
+    answerer = LocalAnswerer()
+
+    samples = []
+    correct = wrong = missed = leaked = 0
+    mistakes = []
+    for item in labelled:
+        expected = (item["intent"], item["ref"]) if item["intent"] else None
+        got = classify(item["query"])
+        for _ in range(repeat):
+            start = time.perf_counter()
+            reply = answerer.answer(item["query"], flights, "₹")
+            samples.append(time.perf_counter() - start)
+
+        if reply is not None and got == expected:
+            correct += 1
+        elif reply is not None and expected is None:
+            leaked += 1
+        elif reply is not None:
+            wrong += 1
+        elif expected is not None:
+            missed += 1
+        if got != expected:
+            mistakes.append({"query": item["query"], "expected": expected, "got": got})
+
+    factual = sum(1 for item in labelled if item["intent"])
+    answered = correct + wrong + leaked
+    return {
+        "queries": len(labelled),
+        "factual": factual,
+        "open_ended": len(labelled) - factual,
+        "answered_locally": answered,
+        "precision": round(correct / answered, 4) if answered else None,
+        "recall": round(correct / factual, 4) if factual else None,
+        "open_ended_answered_locally": leaked,
+        "factual_sent_to_llm": missed,
+        "llm_calls_avoided_share": round(answered / len(labelled), 4),
+        "latency": latency_summary(samples),
+        "mistakes": mistakes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="timed runs per query")
+    parser.add_argument("--queries", default=str(QUERIES_PATH), help="labelled query set (JSON)")
+    args = parser.parse_args(argv)
+    report = run(repeat=args.repeat, path=args.queries)
+    sys.stdout.write(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Offline latency/throughput benchmark for search → summary → card render.
+
+Runs the real ``Engine`` against ``StubSerpApi`` and ``FakeGeminiModel`` so
+no network or quota is needed, and prints a JSON report::
+
+    python -m benchmarks.pipeline --users 20 --searches 5 --latency-ms 400
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from aeroscout.engine import TOP_FLIGHTS, Engine, build_params
+from aeroscout.render import render_card
+from benchmarks.stubs import FakeGeminiModel, StubSerpApi
+
+STAGES = ("search", "summary", "render", "total")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2) if samples else None,
+        "p95_ms": round(percentile(samples, 95) * 1000, 2) if samples else None,
+        "p99_ms": round(percentile(samples, 99) * 1000, 2) if samples else None,
+        "max_ms": round(max(samples) * 1000, 2) if samples else None,
+    }
+
+
+def run(users=10, searches=5, distinct_queries=3, latency=0.3, error_rate=0.0, tokens_per_second=200.0,
+        first_token_latency=0.3, response_cache_ttl=900, llm_cache_ttl=86400, quota_per_minute=6000.0,
+        quota_burst=100, seed=0):
+    """Run the benchmark and return the report dict."""
+    rng = random.Random(seed)
+    start_date = date.today() + timedelta(days=30)
+    queries = [
+        build_params("DEL", "BOM", start_date + timedelta(days=offset), None, "INR")
+        for offset in range(distinct_queries)
+    ]
+    plan = [[rng.choice(queries) for _ in range(searches)] for _ in range(users)]
+
+    samples = {stage: [] for stage in STAGES}
+    failures = [0]
+    lock = threading.Lock()
+
+    with StubSerpApi(latency=latency, jitter=latency / 4, error_rate=error_rate, seed=seed) as stub:
+        model = FakeGeminiModel(tokens_per_second=tokens_per_second, first_token_latency=first_token_latency)
+        engine = Engine(
+            {
+                "SERPAPI_API_KEY": "offline",
+                "SERPAPI_URL": stub.url,
+                "SERPAPI_POOL_SIZE": users,
+                "RESPONSE_CACHE_TTL": response_cache_ttl,
+                "LLM_CACHE_TTL": llm_cache_ttl,
+                "QUOTA_PER_MINUTE": quota_per_minute,
+                "QUOTA_BURST": quota_burst,
+            },
+            model=model,
+        )
+        barrier = threading.Barrier(users)
+
+        def user(searches_to_run):
+            barrier.wait()
+            for params in searches_to_run:
+                started = time.perf_counter()
+                results = engine.search_flights(params)
+                searched = time.perf_counter()
+                flights = (results or {}).get("best_flights", [])
+                if not flights:
+                    with lock:
+                        failures[0] += 1
+                    continue
+                engine.summarize(flights, "₹")
+                summarized = time.perf_counter()
+                for flight in flights[:TOP_FLIGHTS]:
+                    render_card(flight, "₹")
+                rendered = time.perf_counter()
+                with lock:
+                    samples["search"].append(searched - started)
+                    samples["summary"].append(summarized - searched)
+                    samples["render"].append(rendered - summarized)
+                    samples["total"].append(rendered - started)
+
+        threads = [threading.Thread(target=user, args=(searches_to_run,)) for searches_to_run in plan]
+        wall_start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+
+        stats = engine.stats()
+        completed = len(samples["total"])
+        return {
+            "config": {
+                "users": users,
+                "searches_per_user": searches,
+                "distinct_queries": distinct_queries,
+                "upstream_latency_ms": latency * 1000,
+                "error_rate": error_rate,
+                "tokens_per_second": tokens_per_second,
+                "response_cache_ttl": response_cache_ttl,
+                "llm_cache_ttl": llm_cache_ttl,
+                "quota_per_minute": quota_per_minute,
+                "quota_burst": quota_burst,
+                "seed": seed,
+            },
+            "wall_s": round(wall, 3),
+            "completed": completed,
+            "failed": failures[0],
+            "throughput_per_s": round(completed / wall, 2) if wall else None,
+            "latency": {stage: latency_summary(samples[stage]) for stage in STAGES},
+            "upstream_calls": {
+                "serpapi": stub.hits,
+                "serpapi_errors": stub.errors,
+                "gemini": model.calls,
+            },
+            "cache_hit_rate": {
+                "response": round(stats["response_cache"]["hit_rate"], 4),
+                "summary": round(stats["llm_caches"]["summary"]["hit_rate"], 4),
+            },
+            "engine": stats,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--searches", type=int, default=5, help="searches per user")
+    parser.add_argument("--distinct-queries", type=int, default=3, help="size of the query pool users draw from")
+    parser.add_argument("--latency-ms", type=float, default=300, help="stub SerpAPI latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub requests answered with 503")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="fake Gemini streaming rate")
+    parser.add_argument("--first-token-ms", type=float, default=300, help="fake Gemini time to first token")
+    parser.add_argument("--response-cache-ttl", type=float, default=900, help="0 disables response caching")
+    parser.add_argument("--llm-cache-ttl", type=float, default=86400, help="0 disables summary caching")
+    parser.add_argument("--quota-per-minute", type=float, default=6000, help="SerpAPI quota refill rate")
+    parser.add_argument("--quota-burst", type=int, default=100, help="SerpAPI quota bucket size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(
+        users=args.users,
+        searches=args.searches,
+        distinct_queries=args.distinct_queries,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        tokens_per_second=args.tokens_per_second,
+        first_token_latency=args.first_token_ms / 1000,
+        response_cache_ttl=args.response_cache_ttl,
+        llm_cache_ttl=args.llm_cache_ttl,
+        quota_per_minute=args.quota_per_minute,
+        quota_burst=args.quota_burst,
+        seed=args.seed,
+    )
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
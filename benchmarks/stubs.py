@@ -0,0 +1,159 @@
+"""Offline stand-ins for SerpAPI and Gemini.
+
+``StubSerpApi`` is a real HTTP server on localhost, so requests go through
+the production ``SerpApiClient`` (pooling, timeouts, retries) untouched.
+``FakeGeminiModel`` mimics the parts of ``google.generativeai`` the engine
+uses and emits text at a fixed token rate.
+"""
+
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name="google_flights_del_bom.json"):
+    with open(FIXTURES / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StubSerpApi:
+    """Localhost server replaying a recorded ``search.json`` payload.
+
+    Every request waits ``latency`` seconds (± ``jitter``) and fails with
+    HTTP 503 at ``error_rate``. The recorded payload is returned with its
+    ``search_parameters`` replaced by the request's and, with
+    ``vary_prices``, every price shifted by a deterministic per-query
+    offset so different searches yield different itineraries. ``hits``
+    counts every request that reached the server.
+    """
+
+    def __init__(self, payload=None, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, vary_prices=True):
+        self.payload = payload if payload is not None else load_fixture()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.vary_prices = vary_prices
+        self.hits = 0
+        self.errors = 0
+        self.requests = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/search.json"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                params = {name: values[0] for name, values in parse_qs(urlparse(self.path).query).items()}
+                status, body = stub.respond(params)
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="stub-serpapi", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def respond(self, params):
+        with self._lock:
+            self.hits += 1
+            self.requests.append(params)
+            fail = self._random.random() < self.error_rate
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            if fail:
+                self.errors += 1
+        time.sleep(delay)
+        if fail:
+            return 503, {"error": "stubbed upstream failure"}
+        params.pop("api_key", None)
+        body = dict(self.payload, search_parameters=params)
+        if self.vary_prices:
+            offset = zlib.crc32(json.dumps(params, sort_keys=True).encode("utf-8")) % 500
+            for group in ("best_flights", "other_flights"):
+                body[group] = [dict(flight, price=flight["price"] + offset) for flight in body.get(group, [])]
+        return 200, body
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Duck-typed ``GenerativeModel`` producing canned text at ``tokens_per_second``.
+
+    A "token" is one whitespace-separated word. ``first_token_latency`` is
+    spent before the first chunk, mirroring real time-to-first-token.
+    """
+
+    def __init__(self, tokens_per_second=200.0, first_token_latency=0.3, reply_tokens=120):
+        self.tokens_per_second = tokens_per_second
+        self.first_token_latency = first_token_latency
+        self.reply_tokens = reply_tokens
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _reply(self, prompt):
+        words = ("AeroScout summary for " + prompt.split("\n")[-1]).split()
+        return (words * (self.reply_tokens // max(len(words), 1) + 1))[:self.reply_tokens]
+
+    def _stream(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.first_token_latency)
+        for word in self._reply(prompt):
+            yield _FakeChunk(word + " ")
+            time.sleep(1.0 / self.tokens_per_second)
+
+    def generate_content(self, prompt, stream=False):
+        chunks = self._stream(prompt if isinstance(prompt, str) else json.dumps(prompt, default=str))
+        return chunks if stream else _FakeChunk("".join(chunk.text for chunk in chunks))
+
+    def start_chat(self, history=None):
+        return FakeChatSession(self, history)
+
+
+class FakeChatSession:
+    def __init__(self, model, history=None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, content, stream=False):
+        self.history.append({"role": "user", "parts": [content]})
+        response = self.model.generate_content(content, stream=stream)
+        self.history.append({"role": "model", "parts": ["(streamed reply)"]})
+        return response
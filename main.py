@@ -1,44 +1,67 @@
 import streamlit as st
-import requests
-from datetime import datetime
-import google.generativeai as genai
-
-# ---------------- CONFIGURATION ----------------
-SERPAPI_API_KEY = st.secrets["SERPAPI_API_KEY"]
-GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
-
-# Initialize Gemini
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-2.5-flash")
-
-# ---------------- AIRPORT → CURRENCY ----------------
-def get_currency_from_airport_code(code):
-    airport_currency_map = {
-        "ATL": "USD", "LAX": "USD", "ORD": "USD", "DFW": "USD", "DEN": "USD", "JFK": "USD", "SFO": "USD",
-        "SEA": "USD", "MIA": "USD", "CLT": "USD", "LAS": "USD", "PHX": "USD", "IAH": "USD", "BOS": "USD",
-        "MSP": "USD", "DTW": "USD", "PHL": "USD", "FLL": "USD", "BWI": "USD", "SLC": "USD", "LHR": "GBP",
-        "LGW": "GBP", "MAN": "GBP", "CDG": "EUR", "ORY": "EUR", "FRA": "EUR", "MUC": "EUR", "BER": "EUR",
-        "AMS": "EUR", "BRU": "EUR", "MAD": "EUR", "BCN": "EUR", "ZRH": "CHF", "VIE": "EUR", "DUB": "EUR",
-        "CPH": "DKK", "OSL": "NOK", "ARN": "SEK", "HEL": "EUR", "IST": "TRY", "ATH": "EUR", "MXP": "EUR",
-        "FCO": "EUR", "LIS": "EUR", "PRG": "CZK", "WAW": "PLN", "BUD": "HUF", "PEK": "CNY", "PVG": "CNY",
-        "CAN": "CNY", "HND": "JPY", "NRT": "JPY", "ICN": "KRW", "SYD": "AUD", "MEL": "AUD", "BNE": "AUD",
-        "DEL": "INR", "BOM": "INR", "BLR": "INR", "DXB": "AED", "AUH": "AED", "DOH": "QAR", "JNB": "ZAR",
-        "CPT": "ZAR", "GRU": "BRL", "GIG": "BRL", "EZE": "ARS", "SCL": "CLP", "LIM": "PEN", "BOG": "COP",
-        "MEX": "MXN", "CUN": "MXN", "YYZ": "CAD", "YVR": "CAD", "YUL": "CAD", "AKL": "NZD", "WLG": "NZD",
-        "SGN": "VND", "HAN": "VND", "BKK": "THB", "KUL": "MYR", "SIN": "SGD", "CGK": "IDR", "MNL": "PHP",
-        "HKG": "HKD", "TPE": "TWD", "RUH": "SAR", "JED": "SAR", "NBO": "KES", "CAI": "EGP", "ADD": "ETB"
-    }
-    return airport_currency_map.get(code.upper(), "USD")
-
-# ---------------- CURRENCY → SYMBOL ----------------
-currency_symbols = {
-    "USD": "$", "INR": "₹", "EUR": "€", "GBP": "£", "AUD": "A$", "JPY": "¥", "CAD": "C$",
-    "CNY": "¥", "CHF": "CHF", "DKK": "kr", "NOK": "kr", "SEK": "kr", "TRY": "₺", "CZK": "Kč",
-    "PLN": "zł", "HUF": "Ft", "AED": "د.إ", "QAR": "ر.ق", "ZAR": "R", "BRL": "R$", "ARS": "$",
-    "CLP": "$", "PEN": "S/", "COP": "$", "MXN": "$", "NZD": "NZ$", "VND": "₫", "THB": "฿",
-    "MYR": "RM", "SGD": "S$", "IDR": "Rp", "PHP": "₱", "HKD": "HK$", "TWD": "NT$", "SAR": "﷼",
-    "KES": "KSh", "EGP": "E£", "ETB": "Br"
-}
+import altair as alt
+import pandas as pd
+import uuid
+
+from aeroscout.airports import default_catalog
+from aeroscout.currency import currency_symbol, get_currency_from_airport_code
+from aeroscout.engine import TOP_FLIGHTS
+from aeroscout.quota import BACKGROUND
+from aeroscout.render import render_card
+from aeroscout.routes import cheapest, route_pairs
+from aeroscout.store import SORT_KEYS, FlightStore
+from aeroscout.tracing import NOOP_SPAN
+from aeroscout.watch import PriceHistory, WatchScheduler
+from resources import get_engine
+
+# Chat turns drawn per page of the conversation history
+CHAT_PAGE_SIZE = 5
+
+# ---------------- ENGINE ----------------
+# Price watches are polled by one background thread per process, never
+# by the script rerun loop
+@st.cache_resource
+def get_price_watcher():
+    settings = engine.settings
+
+    def poll(params):
+        # Background priority, and never a stale response recorded as a new price point
+        with engine.tracer.span("background.watch_poll", route=PriceHistory.route(params)):
+            return engine.search_flights(params, priority=BACKGROUND, allow_stale=False)
+
+    return WatchScheduler(
+        PriceHistory(settings["WATCH_DB_PATH"]),
+        poll,
+        interval=settings["WATCH_INTERVAL"],
+        jitter=settings["WATCH_JITTER"],
+        polls_per_hour=settings["WATCH_POLLS_PER_HOUR"],
+        retry_delay=settings["WATCH_RETRY_DELAY"],
+    ).start()
+
+engine = get_engine()
+airports = default_catalog()
+price_watcher = get_price_watcher()
+
+# ---------------- PRICE GRID ----------------
+def draw_price_grid(placeholder, cells, symbol):
+    rows = [
+        {"Departure": outbound, "Return": back or "One way", "Price": price}
+        for (outbound, back), price in cells.items()
+    ]
+    data = pd.DataFrame(rows)
+    base = alt.Chart(data).encode(
+        x=alt.X("Departure:O", sort="ascending"),
+        y=alt.Y("Return:O", sort="ascending"),
+    )
+    heatmap = base.mark_rect().encode(
+        color=alt.Color("Price:Q", scale=alt.Scale(scheme="tealblues", reverse=True), legend=None),
+        tooltip=["Departure", "Return", "Price"],
+    )
+    labels = base.mark_text(color="white").encode(text=alt.Text("Price:Q", format=",.0f"))
+    placeholder.altair_chart(
+        (heatmap + labels).properties(title=f"Cheapest fare by date ({symbol})"),
+        width="stretch",
+    )
 
 # ---------------- STYLE ----------------
 st.set_page_config(page_title="AeroScout", layout="wide", page_icon="✈️")
@@ -101,117 +124,255 @@ with st.expander("ℹ️ About AeroScout"):
 
 # ---------------- LAYOUT ----------------
 left_col, right_col = st.columns(2)
+# Itineraries in the order their cards are numbered, so the chat's
+# "option 2" and "the cheapest" mean what the user sees
+shown_flights = None
 
 # ---------------- LEFT COLUMN ----------------
 with left_col:
     st.subheader("🌍 Search Flights")
+    with st.expander("🔎 Look up an airport code"):
+        lookup = st.text_input("City, airport name or code", placeholder="e.g. London, Heathrow, LH")
+        if lookup:
+            matches = airports.search(lookup, limit=8)
+            if matches:
+                st.table([
+                    {"Code": airport.iata, "Airport": airport.name, "City": airport.city, "Country": airport.country}
+                    for airport in matches
+                ])
+            else:
+                st.caption("No matching airports.")
     with st.form("flight_form"):
-        from_city = st.text_input("From (IATA Code)", value="DEL")
-        to_city = st.text_input("To (IATA Code)", value="BOM")
+        route_help = "Separate several airports with commas, or use a metro code such as LON or NYC."
+        from_city = st.text_input("From (IATA Code)", value="DEL", help=route_help)
+        to_city = st.text_input("To (IATA Code)", value="BOM", help=route_help)
         date = st.date_input("Departure Date")
         return_date = st.date_input("Return Date (optional)", value=None)
         passengers = st.number_input("Passengers", min_value=1, value=1)
+        flex_days = st.slider("Flexible dates (± days)", min_value=0, max_value=3, value=0)
         submit = st.form_submit_button("🔍 Search Flights")
 
+    # Reject unknown codes locally instead of spending a SerpAPI call on them
     if submit:
-        selected_currency = get_currency_from_airport_code(from_city)
-        symbol = currency_symbols.get(selected_currency, selected_currency)
-
-        params = {
-            "engine": "google_flights",
-            "departure_id": from_city,
-            "arrival_id": to_city,
-            "outbound_date": date.strftime("%Y-%m-%d"),
-            "currency": selected_currency,
-            "hl": "en",
-            "api_key": SERPAPI_API_KEY
-        }
-        if return_date:
-            params["return_date"] = return_date.strftime("%Y-%m-%d")
-
-        response = requests.get("https://serpapi.com/search.json", params=params)
-
-        if response.status_code == 200:
-            results = response.json()
-            flights = results.get("best_flights", [])
-
-            if flights:
-                # Cache flights and symbol
-                st.session_state["cached_flights"] = flights
+        origins, origin_error = airports.resolve(from_city, "From")
+        destinations, destination_error = airports.resolve(to_city, "To")
+        route_errors = [error for error in (origin_error, destination_error) if error]
+        if not route_errors:
+            pair_count = len(route_pairs(origins, destinations))
+            max_pairs = engine.settings["MAX_ROUTE_PAIRS"]
+            if not pair_count:
+                route_errors.append("From and To must be different airports.")
+            elif pair_count > max_pairs:
+                route_errors.append(f"That is {pair_count} routes; please narrow it down to at most {max_pairs}.")
+        for error in route_errors:
+            st.error(error)
+        submit = not route_errors
+
+    # One trace per submit, covering search, cards, summary and grid; the
+    # span is ended even when a stage raises
+    with engine.tracer.span("request.search", routes=pair_count) if submit else NOOP_SPAN:
+        if submit:
+            # Every route is priced in the first origin's currency so fares compare directly
+            selected_currency = get_currency_from_airport_code(origins[0])
+            symbol = currency_symbol(selected_currency)
+
+            # Routes are searched concurrently; the cheapest options so far
+            # are drawn as each one completes
+            store = FlightStore()
+            route_params = {}
+            route_results = []
+            partial_cards = st.empty()
+            for searched, (route, params, results) in enumerate(
+                engine.route_search(origins, destinations, date, return_date, selected_currency), 1
+            ):
+                if results is None:
+                    continue
+                store.add(results, route)
+                route_params[route] = params
+                route_results.append(results)
+                if pair_count > 1:
+                    with partial_cards.container():
+                        st.caption(f"Searched {searched} of {pair_count} routes…")
+                        for flight in cheapest(route_results, TOP_FLIGHTS, groups=("best_flights", "other_flights")):
+                            st.markdown(render_card(flight, symbol), unsafe_allow_html=True)
+            partial_cards.empty()
+
+            # A new search replaces the previous one, even when it finds nothing
+            for key in ("flight_store", "cached_flights", "route_params", "search_params", "gemini_summary",
+                        "gemini_chat", "answered_query", "chat_shown", "summary_pending"):
+                st.session_state.pop(key, None)
+
+            if not route_results:
+                st.error("Flight search is unavailable right now. Please try again in a moment.")
+            elif not len(store):
+                st.warning("No flights found for this search.")
+            else:
+                # The store keeps every itinerary, best and other, so filtering
+                # and paging never go back to SerpAPI
                 st.session_state["cached_symbol"] = symbol
-
-                # Gemini Summary Prompt
-                flight_summaries = []
-                for flight in flights[:5]:
-                    price = flight.get("price", "N/A")
-                    duration = flight.get("total_duration", "N/A")
-                    flight_type = flight.get("type", "Unknown").title()
-                    segments = flight.get("flights", [])
-                    seg_info = ", ".join(
-                        f"{seg.get('airline', '')} from {seg.get('departure_airport', {}).get('id', '')} to {seg.get('arrival_airport', {}).get('id', '')}"
-                        for seg in segments
-                    )
-                    flight_summaries.append(f"{flight_type} flight costing {symbol}{price}, duration {duration} minutes, segments: {seg_info}.")
-
-                policy_prompt = """
-                Summarize the following flights and include:
-                - Price, duration, stops, and airlines
-                - Baggage policy, seat comfort, amenities, and cancellation rules for each airline
-                - Recommendation for best overall, best value, and most comfortable
-                """
-
-                full_summary_prompt = policy_prompt + "\n\nFlights:\n" + "\n".join(flight_summaries)
-
-                summary_response = model.generate_content(full_summary_prompt)
-                summary_text = summary_response.text
-
-                # Cache the summary persistently
-                st.session_state["gemini_summary"] = summary_text
-
-                # Save chat session
-                st.session_state["gemini_chat"] = model.start_chat(history=[
-                    {"role": "user", "parts": [full_summary_prompt]},
-                    {"role": "model", "parts": [summary_text]}
-                ])
-
-    # Show Gemini summary once above the flight cards if cached
-    if "gemini_summary" in st.session_state:
-        st.info(f"**Gemini Summary:**\n\n{st.session_state['gemini_summary']}")
-
-    # Show flight cards (either new search or cached)
-    if "cached_flights" in st.session_state and "cached_symbol" in st.session_state:
-        cached_flights = st.session_state["cached_flights"]
-        cached_symbol = st.session_state["cached_symbol"]
-        for flight in cached_flights[:5]:
-            price = flight.get("price", "N/A")
-            duration = flight.get("total_duration", "N/A")
-            flight_type = flight.get("type", "Unknown").title()
-            segments = flight.get("flights", [])
-
-            try:
-                mins = int(duration)
-                hours = mins // 60
-                minutes = mins % 60
-                duration_formatted = f"{hours}h {minutes}m"
-            except:
-                duration_formatted = f"{duration} min"
-
-            segment_items = []
-            for seg in segments:
-                airline = seg.get("airline", "Unknown Airline")
-                dep = seg.get("departure_airport", {})
-                arr = seg.get("arrival_airport", {})
-                segment_items.append(f"<li><strong>{airline}</strong>: {dep.get('name', '')} ({dep.get('id', '')}) {dep.get('time', '')} → {arr.get('name', '')} ({arr.get('id', '')}) {arr.get('time', '')}</li>")
-
-            segments_html = "<ul>" + "".join(segment_items) + "</ul>"
-
-            st.markdown(f"""
-            <div class="flight-card">
-                <h4>✈️ <strong>{flight_type}</strong> - <span style="color:#0a9396;">{cached_symbol}{price}</span></h4>
-                <p><strong>Total Duration:</strong> {duration_formatted}</p>
-                {segments_html}
-            </div>
-            """, unsafe_allow_html=True)
+                st.session_state["flight_store"] = store
+                st.session_state["card_page"] = 1
+                st.session_state["route_params"] = route_params
+                # Watching is per route, so only single-route searches offer it
+                if pair_count == 1:
+                    st.session_state["search_params"] = next(iter(route_params.values()))
+                st.session_state["prefetch_returns"] = return_date is not None
+
+                if pair_count == 1:
+                    flights = route_results[0].get("best_flights", [])
+                else:
+                    flights = cheapest(route_results, TOP_FLIGHTS)
+                # Summary and chat need Google's shortlist; generated after the
+                # cards are drawn, see below
+                if flights:
+                    st.session_state["cached_flights"] = flights
+                    st.session_state["summary_pending"] = True
+                else:
+                    st.caption("Google highlighted no flights for this search, so there is no Gemini summary.")
+
+        # Gemini summary sits above the flight cards but is filled in after them
+        summary_placeholder = st.empty()
+        if "gemini_summary" in st.session_state:
+            summary_placeholder.info(f"**Gemini Summary:**\n\n{st.session_state['gemini_summary']}")
+
+        # Show flight cards (either new search or cached), filtered locally
+        if "flight_store" in st.session_state and "cached_symbol" in st.session_state:
+            store = st.session_state["flight_store"]
+            cached_symbol = st.session_state["cached_symbol"]
+
+            insights = store.price_insights
+            if insights.get("lowest_price") and insights.get("typical_price_range"):
+                low, high = insights["typical_price_range"]
+                st.caption(
+                    f"Prices are currently **{insights.get('price_level', 'unknown')}**: lowest {cached_symbol}{insights['lowest_price']}, "
+                    f"typically {cached_symbol}{low}–{cached_symbol}{high}."
+                )
+
+            # Watch this route: polled in the background, charted from SQLite
+            search_params = st.session_state.get("search_params", {})
+            if search_params:
+                watcher_id = st.session_state.setdefault("watcher_id", uuid.uuid4().hex)
+                price_history = price_watcher.history
+                if price_history.is_watching(search_params, watcher_id):
+                    if st.button("🔕 Stop watching this route"):
+                        price_history.remove_watch(search_params, watcher_id)
+                        st.rerun()
+                elif st.button("👁️ Watch this route"):
+                    current_price = store.price_range()[0] if len(store) else None
+                    price_watcher.subscribe(search_params, watcher_id, current_price)
+                    st.rerun()
+
+                points = price_history.history(search_params)
+                if points:
+                    trend = pd.DataFrame(points, columns=["Observed", "Cheapest fare"])
+                    trend["Observed"] = pd.to_datetime(trend["Observed"], unit="s")
+                    st.line_chart(trend, x="Observed", y="Cheapest fare", height=180)
+
+            with st.expander(f"🔎 Filter & sort {len(store)} itineraries"):
+                min_price, max_price = store.price_range()
+                min_duration, max_duration = store.duration_range()
+                sort_by = st.selectbox("Sort by", SORT_KEYS, format_func=str.title)
+                max_stops = st.selectbox("Max stops", [None, 0, 1, 2], format_func=lambda n: "Any" if n is None else str(n))
+                airlines = st.multiselect("Airlines", store.airline_names())
+                price_ceiling = st.slider(
+                    f"Max price ({cached_symbol})", int(min_price), int(max_price) + 1, int(max_price) + 1
+                )
+                duration_ceiling = st.slider(
+                    "Max duration (min)", min_duration, max_duration + 1, max_duration + 1,
+                    format="%d", help="Total journey time including layovers",
+                )
+                departure_window = st.slider("Departure between (hour)", 0, 24, (0, 24))
+                route_names = store.route_names()
+                routes = st.multiselect("Routes", route_names) if len(route_names) > 1 else None
+
+            matches = store.query(
+                max_stops=max_stops,
+                airlines=airlines,
+                max_duration=duration_ceiling,
+                departure_window=None if departure_window == (0, 24) else (departure_window[0] * 60, departure_window[1] * 60),
+                # At its maximum the slider means "any price", including itineraries without one
+                max_price=None if price_ceiling > max_price else price_ceiling,
+                sort_by=sort_by,
+                routes=routes,
+            )
+            page_count = max(1, -(-len(matches) // TOP_FLIGHTS))
+            page = min(st.session_state.get("card_page", 1), page_count)
+            st.caption(f"{len(matches)} matching itineraries · page {page} of {page_count}")
+            route_params = st.session_state.get("route_params", {})
+            shown_flights = [store.flights[i] for i in matches]
+            with engine.tracer.span("render.cards", page=page):
+                first = (page - 1) * TOP_FLIGHTS
+                for n, i in enumerate(matches[first:first + TOP_FLIGHTS], first + 1):
+                    flight = store.flights[i]
+                    st.caption(f"Option {n}")
+                    st.markdown(render_card(flight, cached_symbol), unsafe_allow_html=True)
+
+                    # Round trips: return legs are fetched on demand per outbound
+                    token = flight.get("departure_token")
+                    params = route_params.get(store.routes[i], {})
+                    if token and "return_date" in params:
+                        if st.toggle("Show return flights", key=f"return_{store.routes[i]}_{token}"):
+                            return_results = engine.return_legs(params, token)
+                            return_flights = FlightStore(return_results)
+                            if return_results is None:
+                                st.caption("Return flights are unavailable right now. Please try again in a moment.")
+                            elif not len(return_flights):
+                                st.caption("No return flights found for this outbound.")
+                            for return_flight in return_flights.page(return_flights.query(), 1, 3):
+                                st.markdown(render_card(return_flight, cached_symbol), unsafe_allow_html=True)
+
+            if page_count > 1:
+                prev_col, next_col = st.columns(2)
+                if prev_col.button("← Previous", disabled=page <= 1):
+                    st.session_state["card_page"] = page - 1
+                    st.rerun()
+                if next_col.button("Next →", disabled=page >= page_count):
+                    st.session_state["card_page"] = page + 1
+                    st.rerun()
+
+        # Warm return legs for the cheapest outbounds while the summary streams
+        if st.session_state.pop("prefetch_returns", False):
+            store = st.session_state["flight_store"]
+            route_params = st.session_state["route_params"]
+            # The prefetch budget is shared across routes, at least one leg each
+            per_route = max(1, engine.settings["RETURN_PREFETCH_TOP_K"] // len(route_params))
+            for route, params in route_params.items():
+                engine.prefetch_return_legs(params, store.departure_tokens(store.query(routes=[route]), per_route))
+
+        # Stream a pending summary now that the cards are already on screen
+        if st.session_state.get("summary_pending"):
+            cached_flights = st.session_state["cached_flights"]
+            cached_symbol = st.session_state["cached_symbol"]
+            summary_text = engine.summarize(
+                cached_flights,
+                cached_symbol,
+                on_text=lambda text: summary_placeholder.info(f"**Gemini Summary:**\n\n{text}▌"),
+            )
+            summary_placeholder.info(f"**Gemini Summary:**\n\n{summary_text}")
+
+            # Cache the summary persistently
+            st.session_state["gemini_summary"] = summary_text
+            del st.session_state["summary_pending"]
+
+            # Save chat session
+            st.session_state["gemini_chat"] = engine.start_chat(cached_flights, cached_symbol, summary_text)
+
+        # Flexible-date grid, filled in cell by cell as searches complete
+        grid_placeholder = st.empty()
+        if submit:
+            st.session_state.pop("price_grid", None)
+            if flex_days and pair_count > 1:
+                st.caption("Flexible dates are only searched for a single route.")
+            elif flex_days:
+                cells = {}
+                for cell, price in engine.price_grid(
+                    origins[0], destinations[0], date, return_date, selected_currency, flex_days
+                ):
+                    cells[cell] = price
+                    draw_price_grid(grid_placeholder, cells, symbol)
+                st.session_state["price_grid"] = (cells, symbol)
+        elif "price_grid" in st.session_state:
+            draw_price_grid(grid_placeholder, *st.session_state["price_grid"])
 
 # ---------------- RIGHT COLUMN ----------------
 with right_col:
@@ -219,17 +380,61 @@ with right_col:
     if "gemini_chat" not in st.session_state:
         st.warning("Search for flights to start chatting.")
     else:
+        context = st.session_state["gemini_chat"]
         query = st.text_input("Ask about these flights, airline policies, or travel tips...")
-        if query:
+        # The text box keeps its value across reruns; answer each question once
+        if query and query != st.session_state.get("answered_query"):
             allowed_keywords = ["flight", "airline", "baggage", "cancellation", "travel", "airport", "boarding", "ticket", "visa", "transit", "itinerary"]
-            if any(keyword in query.lower() for keyword in allowed_keywords):
-                chat = st.session_state["gemini_chat"]
-                response = chat.send_message(query)
-                reply = response.text
-                st.session_state.setdefault("chat_history", []).append(("You", query))
-                st.session_state["chat_history"].append(("AeroScout AI", reply))
-            else:
+            reply_placeholder = st.empty()
+            # Factual questions about the cards are answered locally even
+            # without a keyword; only travel questions may reach Gemini
+            with engine.tracer.span("request.chat"):
+                reply = engine.answer(
+                    context,
+                    query,
+                    on_text=lambda text: reply_placeholder.markdown(f"**AeroScout AI:** {text}▌"),
+                    use_model=any(keyword in query.lower() for keyword in allowed_keywords),
+                    flights=shown_flights,
+                )
+            reply_placeholder.empty()
+            if reply is None:
                 st.warning("❌ This assistant only answers flight, airline, and travel-related questions.")
-
-        for speaker, msg in reversed(st.session_state.get("chat_history", [])):
-            st.markdown(f"**{speaker}:** {msg}")
+            else:
+                st.session_state["answered_query"] = query
+
+        # Newest first, one page at a time, so long chats stay cheap to redraw
+        shown = st.session_state.get("chat_shown", CHAT_PAGE_SIZE)
+        for turn in context.turns[::-1][:shown]:
+            st.markdown(f"**You:** {turn.query}")
+            st.markdown(f"**AeroScout AI:** {turn.reply}")
+            if turn.source == "gemini":
+                st.caption(f"Prompt ≈ {turn.prompt_tokens} tokens")
+            else:
+                st.caption("Answered from the flight data" if turn.source == "local" else "Answered from cache")
+        if len(context.turns) > shown:
+            if st.button(f"Show earlier messages ({len(context.turns) - shown} more)"):
+                st.session_state["chat_shown"] = shown + CHAT_PAGE_SIZE
+                st.rerun()
+
+# ---------------- DEBUG PANEL ----------------
+if st.secrets.get("SHOW_DEBUG_PANEL", False):
+    with st.expander("🛠️ Debug"):
+        stats = engine.stats()
+        st.markdown("**SerpAPI response cache**")
+        st.json(stats["response_cache"])
+        st.markdown("**SerpAPI quota**")
+        st.json(stats["quota"])
+        st.markdown("**SerpAPI client**")
+        st.json(stats["serpapi_client"])
+        st.markdown("**Request coalescing**")
+        st.json(stats["coalescing"])
+        st.markdown("**Gemini caches**")
+        st.json(stats["llm_caches"])
+        st.markdown("**Gemini generation**")
+        st.json(stats["generation"])
+        st.dataframe(engine.generation_stats.recent())
+        if "gemini_chat" in st.session_state:
+            st.markdown("**Chat context**")
+            st.json(st.session_state["gemini_chat"].stats())
+        st.markdown("**Price watches**")
+        st.json(price_watcher.stats())
@@ -0,0 +1,116 @@
+import hmac
+import json
+from datetime import datetime
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from aeroscout.tracing import duration_ms, to_otlp
+from resources import get_engine
+
+# Span names that wrap a call leaving the process
+UPSTREAM_STAGES = ("serpapi.request", "serpapi.decode", "quota.wait", "summary.generate_content", "chat.send_message")
+
+st.title("🛠️ Traces")
+
+# ---------------- ACCESS ----------------
+admin_password = st.secrets.get("ADMIN_PASSWORD")
+if not admin_password:
+    st.info("This page is disabled. Set `ADMIN_PASSWORD` in the app secrets to enable it.")
+    st.stop()
+if not st.session_state.get("is_admin"):
+    password = st.text_input("Admin password", type="password")
+    if not password:
+        st.stop()
+    if not hmac.compare_digest(password.encode(), str(admin_password).encode()):
+        st.error("Wrong password.")
+        st.stop()
+    st.session_state["is_admin"] = True
+    st.rerun()
+
+tracer = get_engine().tracer
+if not tracer.enabled:
+    st.warning("Tracing is off. Set `TRACE_ENABLED = true` in the app secrets and restart the app.")
+    st.stop()
+
+records = tracer.records()
+if st.button("🔄 Refresh"):
+    st.rerun()
+if not records:
+    st.caption("No spans recorded yet. Run a search on the main page.")
+    st.stop()
+st.caption(f"{len(records)} spans in the ring buffer, oldest {datetime.fromtimestamp(int(records[0]['startTimeUnixNano']) / 1e9):%H:%M:%S}.")
+
+# ---------------- STAGES ----------------
+st.subheader("Latency per stage")
+stats = tracer.stage_stats(records)
+st.dataframe(pd.DataFrame.from_dict(stats, orient="index"), width="stretch")
+
+stage = st.selectbox("Histogram for", list(stats))
+durations = pd.DataFrame({"Duration (ms)": [duration_ms(record) for record in records if record["name"] == stage]})
+st.altair_chart(
+    alt.Chart(durations).mark_bar().encode(
+        x=alt.X("Duration (ms):Q", bin=alt.Bin(maxbins=30)),
+        y=alt.Y("count()", title="Spans"),
+    ),
+    width="stretch",
+)
+
+# ---------------- UPSTREAM ERRORS ----------------
+st.subheader("Upstream calls")
+upstream = {name: stats[name] for name in UPSTREAM_STAGES if name in stats}
+if upstream:
+    st.dataframe(
+        pd.DataFrame.from_dict(upstream, orient="index")[["count", "error_rate", "p50_ms", "p95_ms"]],
+        width="stretch",
+    )
+errors = [record for record in records if record["status"]["code"] == "STATUS_CODE_ERROR"]
+if errors:
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "At": datetime.fromtimestamp(int(record["startTimeUnixNano"]) / 1e9),
+                "Stage": record["name"],
+                "Error": record["status"]["message"],
+            }
+            for record in errors[-20:]
+        ]),
+        width="stretch",
+    )
+else:
+    st.caption("No failed spans.")
+
+# ---------------- SLOWEST REQUESTS ----------------
+st.subheader("Slowest recent requests")
+limit = st.slider("Requests", 1, 25, 10)
+for root, children in tracer.slowest(limit, records):
+    started = int(root["startTimeUnixNano"])
+    with st.expander(
+        f"{root['name']} · {duration_ms(root):.0f} ms · {datetime.fromtimestamp(started / 1e9):%H:%M:%S}"
+    ):
+        st.json(root["attributes"])
+        if children:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Stage": child["name"],
+                        "Starts at (ms)": round((int(child["startTimeUnixNano"]) - started) / 1e6, 1),
+                        "Duration (ms)": round(duration_ms(child), 1),
+                        "Status": "error" if child["status"]["code"] == "STATUS_CODE_ERROR" else "ok",
+                        "Attributes": json.dumps(child["attributes"]),
+                    }
+                    for child in children
+                ]),
+                width="stretch",
+            )
+
+# ---------------- EXPORT ----------------
+st.subheader("Export")
+jsonl_col, otlp_col = st.columns(2)
+jsonl_col.download_button(
+    "Spans (JSONL)", "".join(json.dumps(record) + "\n" for record in records), "spans.jsonl", "application/jsonl"
+)
+otlp_col.download_button(
+    "OTLP/JSON payload", json.dumps(to_otlp(records)), "spans.otlp.json", "application/json"
+)
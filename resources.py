@@ -0,0 +1,13 @@
+"""Process-wide objects shared by every Streamlit page of the app."""
+
+import streamlit as st
+
+from aeroscout.engine import Engine
+
+
+# Built once per process: clients, caches, counters and traces are shared
+# by every session and page, and nothing connects upstream until the first
+# search.
+@st.cache_resource
+def get_engine():
+    return Engine(st.secrets)
@@ -0,0 +1,108 @@
+"""Regenerate ``aeroscout/data/airports.csv`` and ``metro_areas.csv`` from ``airportsdata``.
+
+    pip install airportsdata
+    python scripts/build_airport_catalog.py
+
+Only airports with an IATA code are kept, and each gets the currency of its
+country. The output is sorted by IATA code, which is the order
+``AirportCatalog`` expects. Metro areas are IATA's multi-airport city
+codes (``LON``, ``NYC``, ...) with their member airports, with
+``METRO_FIXES`` applied on top of ``airportsdata``'s table.
+"""
+
+import csv
+import sys
+from pathlib import Path
+
+# ISO 3166 country → ISO 4217 currency used for fares departing there
+COUNTRY_CURRENCIES = {
+    "AE": "AED", "AF": "AFN", "AG": "XCD", "AI": "XCD", "AL": "ALL", "AM": "AMD", "AO": "AOA", "AQ": "USD",
+    "AR": "ARS", "AS": "USD", "AT": "EUR", "AU": "AUD", "AW": "AWG", "AZ": "AZN", "BA": "BAM", "BB": "BBD",
+    "BD": "BDT", "BE": "EUR", "BF": "XOF", "BG": "EUR", "BH": "BHD", "BI": "BIF", "BJ": "XOF", "BL": "EUR",
+    "BM": "BMD", "BN": "BND", "BO": "BOB", "BQ": "USD", "BR": "BRL", "BS": "BSD", "BT": "BTN", "BW": "BWP",
+    "BY": "BYN", "BZ": "BZD", "CA": "CAD", "CC": "AUD", "CD": "CDF", "CF": "XAF", "CG": "XAF", "CH": "CHF",
+    "CI": "XOF", "CK": "NZD", "CL": "CLP", "CM": "XAF", "CN": "CNY", "CO": "COP", "CR": "CRC", "CU": "CUP",
+    "CV": "CVE", "CW": "ANG", "CX": "AUD", "CY": "EUR", "CZ": "CZK", "DE": "EUR", "DJ": "DJF", "DK": "DKK",
+    "DM": "XCD", "DO": "DOP", "DZ": "DZD", "EC": "USD", "EE": "EUR", "EG": "EGP", "EH": "MAD", "ER": "ERN",
+    "ES": "EUR", "ET": "ETB", "FI": "EUR", "FJ": "FJD", "FK": "FKP", "FM": "USD", "FO": "DKK", "FR": "EUR",
+    "GA": "XAF", "GB": "GBP", "GD": "XCD", "GE": "GEL", "GF": "EUR", "GG": "GBP", "GH": "GHS", "GI": "GIP",
+    "GL": "DKK", "GM": "GMD", "GN": "GNF", "GP": "EUR", "GQ": "XAF", "GR": "EUR", "GT": "GTQ", "GU": "USD",
+    "GW": "XOF", "GY": "GYD", "HK": "HKD", "HN": "HNL", "HR": "EUR", "HT": "HTG", "HU": "HUF", "ID": "IDR",
+    "IE": "EUR", "IL": "ILS", "IM": "GBP", "IN": "INR", "IQ": "IQD", "IR": "IRR", "IS": "ISK", "IT": "EUR",
+    "JE": "GBP", "JM": "JMD", "JO": "JOD", "JP": "JPY", "KE": "KES", "KG": "KGS", "KH": "KHR", "KI": "AUD",
+    "KM": "KMF", "KN": "XCD", "KP": "KPW", "KR": "KRW", "KW": "KWD", "KY": "KYD", "KZ": "KZT", "LA": "LAK",
+    "LB": "LBP", "LC": "XCD", "LK": "LKR", "LR": "LRD", "LS": "LSL", "LT": "EUR", "LU": "EUR", "LV": "EUR",
+    "LY": "LYD", "MA": "MAD", "MD": "MDL", "ME": "EUR", "MF": "EUR", "MG": "MGA", "MH": "USD", "MK": "MKD",
+    "ML": "XOF", "MM": "MMK", "MN": "MNT", "MO": "MOP", "MP": "USD", "MQ": "EUR", "MR": "MRU", "MS": "XCD",
+    "MT": "EUR", "MU": "MUR", "MV": "MVR", "MW": "MWK", "MX": "MXN", "MY": "MYR", "MZ": "MZN", "NA": "NAD",
+    "NC": "XPF", "NE": "XOF", "NF": "AUD", "NG": "NGN", "NI": "NIO", "NL": "EUR", "NO": "NOK", "NP": "NPR",
+    "NR": "AUD", "NU": "NZD", "NZ": "NZD", "OM": "OMR", "PA": "USD", "PE": "PEN", "PF": "XPF", "PG": "PGK",
+    "PH": "PHP", "PK": "PKR", "PL": "PLN", "PM": "EUR", "PT": "EUR", "PW": "USD", "PY": "PYG", "QA": "QAR",
+    "RE": "EUR", "RO": "RON", "RS": "RSD", "RU": "RUB", "RW": "RWF", "SA": "SAR", "SB": "SBD", "SC": "SCR",
+    "SD": "SDG", "SE": "SEK", "SG": "SGD", "SH": "SHP", "SI": "EUR", "SK": "EUR", "SL": "SLE", "SN": "XOF",
+    "SO": "SOS", "SR": "SRD", "SS": "SSP", "ST": "STN", "SV": "USD", "SX": "ANG", "SY": "SYP", "SZ": "SZL",
+    "TC": "USD", "TD": "XAF", "TG": "XOF", "TH": "THB", "TJ": "TJS", "TL": "USD", "TM": "TMT", "TN": "TND",
+    "TO": "TOP", "TR": "TRY", "TT": "TTD", "TV": "AUD", "TW": "TWD", "TZ": "TZS", "UA": "UAH", "UG": "UGX",
+    "UM": "USD", "US": "USD", "UY": "UYU", "UZ": "UZS", "VC": "XCD", "VE": "VES", "VG": "USD", "VN": "VND",
+    "VU": "VUV", "WF": "XPF", "WS": "WST", "XK": "EUR", "YE": "YER", "YT": "EUR", "ZA": "ZAR", "ZM": "ZMW",
+    "ZW": "USD",
+}
+
+# Corrections to airportsdata's metro table: member airports it lacks
+# (added) and wrong fields (replaced)
+METRO_FIXES = {
+    "JNB": {"airports": {"JNB"}},
+    "LON": {"airports": {"SEN"}},
+    "NYC": {"airports": {"EWR"}},
+    "SLU": {"country": "LC"},
+    "WAS": {"airports": {"BWI"}},
+}
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "aeroscout" / "data"
+OUTPUT = DATA_DIR / "airports.csv"
+METRO_OUTPUT = DATA_DIR / "metro_areas.csv"
+
+
+def main():
+    import airportsdata
+
+    airports = airportsdata.load("IATA")
+    missing = sorted({airport["country"] for airport in airports.values()} - COUNTRY_CURRENCIES.keys())
+    if missing:
+        sys.exit(f"no currency for countries: {', '.join(missing)}")
+
+    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["iata", "name", "city", "country", "currency", "lat", "lon"])
+        for code in sorted(airports):
+            airport = airports[code]
+            writer.writerow([
+                code,
+                airport["name"],
+                airport["city"],
+                airport["country"],
+                COUNTRY_CURRENCIES[airport["country"]],
+                f"{airport['lat']:.4f}",
+                f"{airport['lon']:.4f}",
+            ])
+    print(f"wrote {len(airports)} airports to {OUTPUT}")
+
+    metros = airportsdata.load_iata_macs()
+    for code, fixes in METRO_FIXES.items():
+        metro = metros[code]
+        for field, value in fixes.items():
+            metro[field] = set(metro[field]) | value if field == "airports" else value
+        unknown = sorted(set(metro["airports"]) - airports.keys())
+        if unknown:
+            sys.exit(f"metro {code} lists unknown airports: {', '.join(unknown)}")
+    with open(METRO_OUTPUT, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["code", "name", "country", "airports"])
+        for code in sorted(metros):
+            metro = metros[code]
+            writer.writerow([code, metro["name"], metro["country"], " ".join(sorted(metro["airports"]))])
+    print(f"wrote {len(metros)} metro areas to {METRO_OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
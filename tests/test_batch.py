@@ -0,0 +1,45 @@
+import json
+
+from aeroscout.batch import run
+from aeroscout.engine import Engine
+from benchmarks.stubs import StubSerpApi
+
+ROUTES = """origin,destination,date
+DEL,BOM,2030-02-01
+DEL,DEL,2030-02-01
+XXX,BOM,2030-02-01
+DEL,BLR;MAA,2030-02-02
+"""
+
+
+def sweep(routes, output, error_rate):
+    with StubSerpApi(error_rate=error_rate) as stub:
+        engine = Engine({"SERPAPI_API_KEY": "offline", "SERPAPI_URL": stub.url, "SERPAPI_MAX_RETRIES": 0})
+        return run(str(routes), str(output), engine, workers=2)
+
+
+def records(output):
+    return [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+
+
+def test_resume_skips_finished_rows_and_numbers_retries(tmp_path):
+    routes = tmp_path / "routes.csv"
+    routes.write_text(ROUTES, encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+
+    first = sweep(routes, output, error_rate=1.0)
+    assert (first["ok"], first["failed"], first["invalid"]) == (0, 3, 2)
+
+    second = sweep(routes, output, error_rate=0.0)
+    assert (second["ok"], second["failed"], second["invalid"], second["skipped"]) == (3, 0, 0, 2)
+
+    third = sweep(routes, output, error_rate=0.0)
+    assert third["skipped"] == 5 and third["searched"] == 0
+
+    lines = records(output)
+    assert len(lines) == 8
+    latest = {}
+    for record in lines:
+        latest[record["key"]] = record
+    assert sorted(record["status"] for record in latest.values()) == ["invalid", "invalid", "ok", "ok", "ok"]
+    assert {record["attempt"] for record in latest.values() if record["status"] == "ok"} == {2}
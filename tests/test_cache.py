@@ -0,0 +1,86 @@
+import pytest
+
+from aeroscout.cache import SqliteTTLCache, TTLCache, cache_key, open_cache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(ttl=60, max_entries=3, clock=None):
+        clock = clock or Clock()
+        if request.param == "memory":
+            return TTLCache(ttl=ttl, max_entries=max_entries, clock=clock)
+        return SqliteTTLCache(str(tmp_path / "cache.db"), ttl=ttl, max_entries=max_entries, clock=clock)
+
+    return make
+
+
+def test_entries_expire_after_ttl(make_cache):
+    clock = Clock()
+    cache = make_cache(ttl=60, clock=clock)
+    cache.set("a", {"price": 1})
+    clock.advance(59)
+    assert cache.get("a") == {"price": 1}
+    clock.advance(1)
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(make_cache):
+    clock = Clock()
+    cache = make_cache(max_entries=2, clock=clock)
+    cache.set("a", 1)
+    clock.advance(1)
+    cache.set("b", 2)
+    clock.advance(1)
+    assert cache.get("a") == 1
+    clock.advance(1)
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_stale_serves_expired_but_not_evicted_entries(make_cache):
+    clock = Clock()
+    cache = make_cache(ttl=10, max_entries=1, clock=clock)
+    cache.set("a", [1, 2])
+    clock.advance(11)
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == [1, 2]
+    cache.set("b", 3)
+    assert cache.get_stale("a") is None
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    clock = Clock()
+    SqliteTTLCache(path, ttl=60, clock=clock, table="responses").set("a", {"best_flights": []})
+
+    reopened = SqliteTTLCache(path, ttl=60, clock=clock, table="responses")
+    assert reopened.get("a") == {"best_flights": []}
+    assert SqliteTTLCache(path, ttl=60, clock=clock, table="other").get("a") is None
+
+
+def test_open_cache_picks_backend_by_path(tmp_path):
+    assert type(open_cache()) is TTLCache
+    assert isinstance(open_cache(str(tmp_path / "c.db")), SqliteTTLCache)
+
+
+def test_cache_key_ignores_api_key_and_code_case():
+    params = {"engine": "google_flights", "departure_id": "del", "arrival_id": "BOM", "api_key": "secret"}
+    assert cache_key(params) == cache_key({"engine": "google_flights", "departure_id": "DEL", "arrival_id": "BOM"})
+    assert cache_key(params) != cache_key(dict(params, arrival_id="BLR"))
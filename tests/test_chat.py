@@ -0,0 +1,38 @@
+from aeroscout.engine import Engine
+from benchmarks.stubs import FakeGeminiModel, load_fixture
+
+FLIGHTS = load_fixture()["best_flights"]
+
+
+def new_engine():
+    return Engine({}, model=FakeGeminiModel(tokens_per_second=10000, first_token_latency=0, reply_tokens=5))
+
+
+def test_opening_question_is_shared_across_conversations():
+    engine = new_engine()
+    first = engine.answer(engine.start_chat(FLIGHTS, "₹", "summary"), "what is the baggage policy?")
+    second = engine.answer(engine.start_chat(FLIGHTS, "₹", "summary"), "What is the baggage policy")
+
+    assert second == first
+    assert engine.model.calls == 1
+
+
+def test_follow_up_is_not_reused_by_another_conversation():
+    engine = new_engine()
+    meals = engine.start_chat(FLIGHTS, "₹", "summary")
+    engine.answer(meals, "do they serve meals?")
+    seats = engine.start_chat(FLIGHTS, "₹", "summary")
+    engine.answer(seats, "how much legroom is there?")
+    assert engine.model.calls == 2
+
+    engine.answer(meals, "is it vegetarian?")
+    engine.answer(seats, "is it vegetarian?")
+    assert engine.model.calls == 4
+    assert seats.turns[-1].source == "gemini"
+
+    # The same conversation replayed up to the same point does reuse it
+    replay = engine.start_chat(FLIGHTS, "₹", "summary")
+    engine.answer(replay, "do they serve meals?")
+    engine.answer(replay, "is it vegetarian?")
+    assert engine.model.calls == 4
+    assert [turn.source for turn in replay.turns] == ["cache", "cache"]
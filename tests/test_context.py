@@ -0,0 +1,62 @@
+from aeroscout.context import ChatContext, compact_turn
+
+
+def words(n, word="word"):
+    return " ".join([word] * n)
+
+
+def context(budget=100, recent_turns=4, primer_tokens=1000):
+    # One token per word keeps the arithmetic readable
+    return ChatContext("fp", words(primer_tokens), "summary", budget=budget, recent_turns=recent_turns,
+                       count_tokens=lambda text: len(text.split()))
+
+
+def test_latest_turn_is_kept_verbatim_even_past_the_budget():
+    chat = context(budget=100, primer_tokens=5000)
+    chat.add_turn("first question", words(10))
+    chat.add_turn("second question", words(300))
+
+    contents = chat.contents()
+    assert contents[-2:] == [
+        {"role": "user", "parts": ["second question"]},
+        {"role": "model", "parts": [words(300)]},
+    ]
+    assert chat.stats()["verbatim_turns"] == 1
+    assert compact_turn("first question", words(10)) in contents[2]["parts"][0]
+
+
+def test_primer_does_not_count_against_the_budget():
+    chat = context(budget=100, primer_tokens=5000)
+    for i in range(3):
+        chat.add_turn(f"question {i}", words(10))
+
+    assert chat.stats()["verbatim_turns"] == 3
+    assert chat.stats()["digest_lines"] == 0
+    assert len(chat.contents()) == 2 + 3 * 2
+
+
+def test_older_turns_fold_into_the_digest_oldest_first():
+    chat = context(budget=100, recent_turns=2)
+    for i in range(4):
+        chat.add_turn(f"question {i}", f"Answer {i}. More detail.")
+
+    assert chat.stats()["verbatim_turns"] == 2
+    digest = chat.contents()[2]["parts"][0].splitlines()
+    assert digest[1:] == ["- Q: question 0 A: Answer 0.", "- Q: question 1 A: Answer 1."]
+    assert [part["parts"][0] for part in chat.contents()[4::2]] == ["question 2", "question 3"]
+
+
+def test_conversation_stays_within_budget_however_long_it_runs():
+    chat = context(budget=100, primer_tokens=1000)
+    for i in range(50):
+        chat.add_turn(f"question {i}", words(20, f"reply{i}"))
+        # Primer: 1000 words plus the one-word summary
+        assert chat.prompt_tokens("") <= 1001 + 100
+
+    assert chat.stats()["turns"] == 50
+    assert chat.stats()["digest_lines"] >= 1
+    assert chat.contents()[-1] == {"role": "model", "parts": [words(20, "reply49")]}
+    # The digest keeps its newest lines within a quarter of the budget
+    digest = chat.contents()[2]["parts"][0].splitlines()[1:]
+    assert sum(len(line.split()) for line in digest) <= 25
+    assert digest[-1].startswith("- Q: question 46 ")
@@ -0,0 +1,17 @@
+from datetime import date
+
+from aeroscout.grid import date_pairs
+
+TODAY = date(2030, 3, 10)
+
+
+def test_past_outbound_dates_are_dropped():
+    pairs = date_pairs(TODAY, None, flex_days=2, today=TODAY)
+    assert pairs == [(date(2030, 3, 10), None), (date(2030, 3, 11), None), (date(2030, 3, 12), None)]
+
+
+def test_round_trip_pairs_keep_future_outbounds_and_ordered_returns():
+    pairs = date_pairs(date(2030, 3, 11), date(2030, 3, 12), flex_days=1, today=TODAY)
+    assert all(outbound >= TODAY and back >= outbound for outbound, back in pairs)
+    assert (date(2030, 3, 10), date(2030, 3, 11)) in pairs
+    assert len(pairs) == 8
@@ -0,0 +1,28 @@
+import pytest
+
+from aeroscout.intents import classify, respond
+from benchmarks.intents import load_queries
+from benchmarks.stubs import load_fixture
+
+QUERIES = load_queries()
+
+
+@pytest.mark.parametrize("item", QUERIES, ids=[item["query"] for item in QUERIES])
+def test_labelled_queries(item):
+    expected = (item["intent"], item["ref"]) if item["intent"] else None
+    assert classify(item["query"]) == expected
+
+
+def test_answers_use_the_given_order():
+    flights = load_fixture()["best_flights"]
+    by_price = sorted(flights, key=lambda flight: flight["price"])
+    assert respond("cheapest", None, by_price, "₹").startswith("The cheapest is option 1 ")
+    assert respond("price", 1, by_price, "₹") == f"Option 2: ₹{by_price[1]['price']}."
+
+
+def test_nonstop_count_counts_only_nonstop_options():
+    results = load_fixture()
+    flights = results["best_flights"] + results["other_flights"]
+    nonstop = sum(1 for flight in flights if not flight.get("layovers"))
+    assert 0 < nonstop < len(flights)
+    assert respond("nonstop_count", None, flights, "₹") == f"{nonstop} of the {len(flights)} options are nonstop."
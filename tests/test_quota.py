@@ -0,0 +1,66 @@
+import threading
+import time
+from datetime import date
+
+from aeroscout.engine import Engine, build_params
+from aeroscout.quota import BACKGROUND, INTERACTIVE, QuotaGovernor, TokenBucket
+from benchmarks.stubs import StubSerpApi
+
+
+def drained_governor(rate):
+    bucket = TokenBucket(rate, 1)
+    assert bucket.try_take()
+    return QuotaGovernor(bucket, max_wait={INTERACTIVE: 5.0, BACKGROUND: 5.0})
+
+
+def test_promoted_wait_is_granted_before_earlier_background_waits():
+    governor = drained_governor(rate=1 / 0.3)
+    order = []
+
+    def wait(name, tag=None):
+        governor.acquire(BACKGROUND, tag=tag)
+        order.append(name)
+
+    first = threading.Thread(target=wait, args=("first",))
+    first.start()
+    time.sleep(0.05)
+    second = threading.Thread(target=wait, args=("promoted", "key"))
+    second.start()
+    time.sleep(0.05)
+    assert governor.promote("key", INTERACTIVE)
+    first.join(5)
+    second.join(5)
+
+    assert order == ["promoted", "first"]
+    assert governor.granted == {INTERACTIVE: 0, BACKGROUND: 2}
+    assert not governor.promote("key", INTERACTIVE)
+
+
+def test_interactive_caller_joining_a_background_fetch_keeps_its_own_deadline():
+    params = build_params("DEL", "BOM", date(2030, 1, 15), date(2030, 1, 20), "INR")
+    with StubSerpApi() as stub:
+        engine = Engine({
+            "SERPAPI_API_KEY": "offline",
+            "SERPAPI_URL": stub.url,
+            "QUOTA_PER_MINUTE": 0.001,
+            "QUOTA_BURST": 1,
+            "QUOTA_INTERACTIVE_WAIT": 0.5,
+            "QUOTA_BACKGROUND_WAIT": 2.0,
+        })
+        assert engine.quota.bucket.try_take()
+
+        prefetch = threading.Thread(target=engine.return_legs, args=(params, "token", BACKGROUND))
+        prefetch.start()
+        time.sleep(0.1)
+        start = time.perf_counter()
+        results = engine.return_legs(params, "token")
+        waited = time.perf_counter() - start
+        queue = engine.quota.stats()["queue_depth"]
+        prefetch.join(5)
+
+    assert results is None
+    assert waited < 1.0
+    # The background fetch was promoted while the user waited on it
+    assert queue == {"interactive": 1, "background": 0}
+    assert engine.quota.shed == {INTERACTIVE: 1, BACKGROUND: 1}
+    assert stub.hits == 0
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+import requests
+
+from aeroscout.serpapi import SerpApiClient, SerpApiError
+from benchmarks.stubs import StubSerpApi
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession:
+    """Plays back ``outcomes`` in order, then keeps returning ``content``."""
+
+    def __init__(self, content, outcomes=()):
+        self.content = content
+        self.outcomes = list(outcomes)
+
+    def get(self, url, params=None, timeout=None):
+        if self.outcomes:
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return FakeResponse(self.content)
+
+
+def test_malformed_body_raises_serpapi_error():
+    client = SerpApiClient("key", sleep=lambda seconds: None)
+    client.session = FakeSession(b"<html>upstream proxy error</html>")
+
+    with pytest.raises(SerpApiError, match="malformed"):
+        client.search({"engine": "google_flights"})
+    assert client.stats()["failures"] == 1
+
+
+def test_valid_body_is_decoded():
+    client = SerpApiClient("key", sleep=lambda seconds: None)
+    client.session = FakeSession(b'{"best_flights": []}')
+
+    assert client.search({"engine": "google_flights"}) == {"best_flights": []}
+    assert client.stats()["failures"] == 0
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError])
+def test_broken_transfer_is_retried_then_wrapped(error):
+    client = SerpApiClient("key", max_retries=1, sleep=lambda seconds: None)
+    client.session = FakeSession(b'{"best_flights": []}', outcomes=[error("cut off")])
+    assert client.search({"engine": "google_flights"}) == {"best_flights": []}
+
+    client.session = FakeSession(b"", outcomes=[error("cut off"), error("cut off")])
+    with pytest.raises(SerpApiError, match=error.__name__):
+        client.search({"engine": "google_flights"})
+    assert client.stats()["retries"] == 2
+    assert client.stats()["failures"] == 1
+
+
+def test_retry_after_header_sets_the_delay():
+    delays = []
+    client = SerpApiClient("key", max_backoff=8.0, sleep=delays.append)
+    client.session = FakeSession(b'{"best_flights": []}', outcomes=[
+        FakeResponse(b"", status_code=429, headers={"Retry-After": "2"}),
+        FakeResponse(b"", status_code=503, headers={"Retry-After": "120"}),
+    ])
+
+    assert client.search({"engine": "google_flights"}) == {"best_flights": []}
+    assert delays == [2.0, 8.0]
+
+
+def test_upstream_errors_are_retried_with_backoff():
+    delays = []
+    with StubSerpApi(error_rate=0.5, seed=3) as stub:
+        client = SerpApiClient("key", base_url=stub.url, max_retries=20, backoff=0.5, sleep=delays.append)
+        for _ in range(5):
+            assert client.search({"engine": "google_flights"})["best_flights"]
+
+    assert stub.errors > 0
+    assert stub.hits == 5 + stub.errors
+    assert client.stats()["retries"] == len(delays) == stub.errors
+    assert client.stats()["failures"] == 0
+    assert all(0 <= delay <= 8.0 for delay in delays)
+
+
+def test_persistent_upstream_error_raises_after_max_retries():
+    delays = []
+    with StubSerpApi(error_rate=1.0) as stub:
+        client = SerpApiClient("key", base_url=stub.url, max_retries=2, backoff=0.5, sleep=delays.append)
+        with pytest.raises(SerpApiError) as excinfo:
+            client.search({"engine": "google_flights"})
+
+    assert excinfo.value.status_code == 503
+    assert stub.hits == 3
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+    assert client.stats()["retries"] == 2
+    assert client.stats()["failures"] == 1
@@ -0,0 +1,118 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from aeroscout.engine import Engine, build_params
+from aeroscout.singleflight import SingleFlight
+from benchmarks.stubs import StubSerpApi
+
+THREADS = 16
+
+
+def test_concurrent_identical_searches_hit_upstream_once():
+    params = build_params("DEL", "BOM", date(2030, 1, 15), None, "INR")
+    with StubSerpApi(latency=0.3) as stub:
+        engine = Engine({"SERPAPI_API_KEY": "offline", "SERPAPI_URL": stub.url, "QUOTA_BURST": THREADS})
+        barrier = threading.Barrier(THREADS)
+
+        def search():
+            barrier.wait()
+            return engine.search_flights(params)
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(lambda _: search(), range(THREADS)))
+
+    assert stub.hits == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["best_flights"]
+    assert engine.single_flights["search"].stats() == {"calls": 1, "shared": THREADS - 1, "in_flight": 0}
+
+
+def test_failure_reaches_every_waiter_and_next_call_retries():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def failing():
+        calls.append("fail")
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def waiter():
+        try:
+            flight.do("key", failing)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=waiter) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    # Hold the leader until everyone has joined its flight
+    while flight.calls + flight.shared < THREADS:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == ["upstream down"] * THREADS
+    assert calls == ["fail"]
+    assert flight.stats() == {"calls": 1, "shared": THREADS - 1, "in_flight": 0}
+    assert flight.do("key", lambda: "recovered") == "recovered"
+    assert flight.calls == 2
+
+
+class Rerun(BaseException):
+    """Stands in for Streamlit's RerunException, raised inside the leader's session."""
+
+
+def test_interrupted_leader_makes_waiters_retry_instead_of_sharing_it():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def interrupted():
+        calls.append("interrupted")
+        release.wait(5)
+        raise Rerun()
+
+    def fresh():
+        calls.append("fresh")
+        return "fresh"
+
+    leader_errors = []
+
+    def leader():
+        try:
+            flight.do("key", interrupted)
+        except Rerun as exc:
+            leader_errors.append(exc)
+
+    results = []
+    errors = []
+
+    def waiter():
+        try:
+            results.append(flight.do("key", fresh))
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=leader)]
+    threads[0].start()
+    while flight.calls < 1:
+        threading.Event().wait(0.01)
+    threads += [threading.Thread(target=waiter) for _ in range(THREADS - 1)]
+    for thread in threads[1:]:
+        thread.start()
+    while flight.shared < THREADS - 1:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(leader_errors) == 1
+    assert errors == []
+    assert results == ["fresh"] * (THREADS - 1)
+    assert calls[0] == "interrupted" and "fresh" in calls
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from aeroscout.store import FlightStore
+
+
+def flight(price, duration, airlines, departure, co2):
+    segments = [{"airline": name, "departure_airport": {"time": f"2030-01-15 {departure}"}} for name in airlines]
+    return {"price": price, "total_duration": duration, "flights": segments, "carbon_emissions": {"this_flight": co2}}
+
+
+@pytest.fixture
+def store():
+    return FlightStore({
+        "best_flights": [
+            flight(5400, 130, ["IndiGo"], "06:00", 98000),        # 0
+            flight(4900, 250, ["IndiGo", "IndiGo"], "05:10", 132000),  # 1
+            flight(None, 120, ["Akasa Air"], "19:15", 97000),     # 2: unpriced
+        ],
+        "other_flights": [
+            flight(5900, 135, ["Air India"], "09:30", 101000),    # 3
+            flight(7400, 415, ["Vistara", "Air India"], "22:45", 168000),  # 4
+        ],
+    }, route="DEL→BOM")
+
+
+def test_unpriced_itineraries_are_kept_as_nan(store):
+    assert math.isnan(store.prices[2])
+    assert store.price_range() == (4900.0, 7400.0)
+    assert list(store.stops) == [0, 1, 0, 0, 1]
+
+
+@pytest.mark.parametrize("sort_by, expected", [
+    ("price", [1, 0, 3, 4, 2]),
+    ("duration", [2, 0, 3, 1, 4]),
+    ("departure", [1, 0, 3, 2, 4]),
+    ("stops", [0, 3, 2, 1, 4]),
+    ("emissions", [2, 0, 3, 1, 4]),
+])
+def test_sort_keys(store, sort_by, expected):
+    assert store.query(sort_by=sort_by) == expected
+
+
+def test_unknown_sort_key_raises(store):
+    with pytest.raises(ValueError, match="unknown sort key"):
+        store.query(sort_by="comfort")
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"max_stops": 0}, [0, 3, 2]),
+    ({"max_price": 5500}, [1, 0]),
+    ({"max_duration": 135}, [0, 3, 2]),
+    ({"departure_window": (6 * 60, 20 * 60)}, [0, 3, 2]),
+    ({"airlines": ["IndiGo"]}, [1, 0]),
+    ({"airlines": ["Air India"]}, [3]),
+    ({"airlines": ["Air India", "Vistara"]}, [3, 4]),
+    ({"routes": ["DEL→BOM"]}, [1, 0, 3, 4, 2]),
+    ({"routes": ["DEL→BLR"]}, []),
+    ({"max_stops": 0, "max_price": 6000, "airlines": ["IndiGo", "Air India"]}, [0, 3]),
+])
+def test_filters(store, filters, expected):
+    assert store.query(**filters) == expected
+
+
+def test_routes_filter_across_added_routes(store):
+    store.add({"best_flights": [flight(3000, 160, ["IndiGo"], "08:00", 90000)]}, route="DEL→BLR")
+
+    assert store.route_names() == ["DEL→BLR", "DEL→BOM"]
+    assert store.query(routes=["DEL→BLR"]) == [5]
+    assert store.query()[0] == 5
+    assert store.price_insights == {}
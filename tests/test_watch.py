@@ -0,0 +1,50 @@
+from datetime import date
+
+from aeroscout.engine import build_params
+from aeroscout.watch import PriceHistory, WatchScheduler
+
+
+def scheduler(tmp_path, now=1000.0):
+    return WatchScheduler(PriceHistory(str(tmp_path / "watch.db")), search=lambda params: None, clock=lambda: now)
+
+
+def test_history_is_per_watch_not_per_route(tmp_path):
+    watcher = scheduler(tmp_path)
+    one_way = build_params("DEL", "BOM", date(2030, 5, 1), None, "INR")
+    round_trip = build_params("DEL", "BOM", date(2030, 5, 1), date(2030, 5, 8), "USD")
+    watcher.subscribe(one_way, "a", 4500)
+    watcher.subscribe(round_trip, "b", 120)
+
+    assert watcher.history.history(one_way) == [(1000.0, 4500)]
+    assert watcher.history.history(round_trip) == [(1000.0, 120)]
+
+
+def test_joining_a_watch_does_not_add_a_price_point(tmp_path):
+    watcher = scheduler(tmp_path)
+    params = build_params("DEL", "BOM", date(2030, 5, 1), None, "INR")
+    watcher.subscribe(params, "a", 4500)
+    watcher.subscribe(params, "b", 4700)
+
+    assert watcher.history.history(params) == [(1000.0, 4500)]
+    assert watcher.history.stats() == {"watches": 1, "subscriptions": 2, "price_points": 1}
+
+
+def test_failed_poll_is_retried_on_a_short_backoff(tmp_path):
+    now = [1000.0]
+    outcomes = [None, None, {"best_flights": [{"price": 4200}]}, {"best_flights": [{"price": 3900}]}]
+    watcher = WatchScheduler(
+        PriceHistory(str(tmp_path / "watch.db")), search=lambda params: outcomes.pop(0),
+        interval=3600, jitter=0, retry_delay=60, clock=lambda: now[0], seed=1,
+    )
+    params = build_params("DEL", "BOM", date(2030, 5, 1), None, "INR")
+    watcher.subscribe(params, "a")
+
+    polled_at = []
+    for now[0] in range(1000, 5000, 30):
+        if watcher.run_pending():
+            polled_at.append(now[0])
+
+    # Failures back off 60s then 120s; success goes back to the full interval
+    assert polled_at == [1000, 1060, 1180, 4780]
+    assert watcher.failures == 2
+    assert watcher.history.history(params) == [(1180.0, 4200), (4780.0, 3900)]